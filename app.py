@@ -1,20 +1,24 @@
+import os
+
 import dash
-from dash import Input, Output, State, dcc, html
+from dash import ClientsideFunction, Input, Output, State, dcc, html
 import dash_bootstrap_components as dbc
-import pandas as pd
-from viz import choroplet_score, heat_area_action, internet_access, cpi_bar, summary
-from dash import callback_context as ctx
-
-FONT_LINK = "https://fonts.googleapis.com/css2?family=Roboto&display=swap"
+import plotly.io as pio
+from flask import Response, abort, request
+import bundle
+import downloads
+import metrics
+import payload
+import profiling
+import slides
+import telemetry
+from slides import SLIDES, TEMPLATES, get_payload
+from viz import geometry
 
-external_stylesheets = [
-    dbc.themes.BOOTSTRAP,
-    FONT_LINK,
-    "https://cdn.jsdelivr.net/gh/AnnMarieW/dash-bootstrap-templates/dbc.min.css",
-    "https://cdn.jsdelivr.net/npm/bootstrap@5.3.2/dist/css/bootstrap.min.css",
-    dbc.icons.FONT_AWESOME,
-    dbc.icons.BOOTSTRAP,
-]
+THEMES = {"light": "plotly", "dark": "plotly_dark"}
+# Cache lifetime of /figures responses requested without the current version
+# (?v=); versioned URLs never change and are cached for a year.
+FIGURE_MAX_AGE = int(os.environ.get("GDB_FIGURE_MAX_AGE", "300"))
 
 config = {
     "displaylogo": False,
@@ -33,535 +37,619 @@ config = {
     "responsive": True,
 }
 
-df_map = pd.read_csv("Datasets/map_indicators.csv", sep=";")
-df_areas = pd.read_csv("Datasets/areas_score.csv", sep=";")
-
-
-def get_plots(template):
-    return [
-        choroplet_score.graph(df_map, template=template),
-        heat_area_action.graph(
-            df_areas.copy(),
-            template=template,
-        ),
-        internet_access.graph(
-            df_areas.copy(),
-            template=template,
-        ),
-        cpi_bar.graph(
-            df_areas.copy(),
-            template=template,
-        ),
-        summary.graph(
-            template=template,
-        ),
-    ]
-
-
 app = dash.Dash(
     __name__,
-    external_stylesheets=external_stylesheets,
     title="GDB Challenge 2025",
     assets_folder="assets",
+    assets_ignore=(
+        bundle.ASSETS_IGNORE
+        if telemetry.ENABLED
+        else f"{bundle.ASSETS_IGNORE}|{telemetry.ASSETS_IGNORE}"
+    ),
     update_title=None,
     suppress_callback_exceptions=True,
 )
+# One self-hosted bundle when scripts/build_assets.py has been run, the CDN
+# stylesheets otherwise. The bundle's URL follows the app's path prefix.
+app.config.external_stylesheets = bundle.stylesheets(app.get_asset_url(""))
 
-app.layout = dbc.Container(
-    [
-        dcc.Store(id="theme-store", data="dark"),
-        html.Div(
-            [
-                html.H4(
-                    "Data Reality in Latin America and the Caribbean: Insights and Opportunities",
-                    id="header-title",
-                    style={"fontWeight": "700"},
-                    className="container pt-4 pb-1",
-                ),
-                html.Div(
-                    [
-                        dbc.Button(
-                            html.I(className="fa-solid fa-circle-info"),
-                            id="btn-info",
-                            color="link",
-                            className="me-2 p-0 text-secondary",
-                            title="About",
-                        ),
-                        dbc.Button(
-                            html.I(className="fa-solid fa-download"),
-                            id="btn-download",
-                            color="link",
-                            className="me-2 px-1 p-0 text-secondary",
-                            title="Datasets",
-                        ),
-                        dbc.Button(
-                            html.I(className="fa-solid fa-expand"),
-                            id="fullscreen-btn",
-                            color="link",
-                            className="me-2 p-0 text-secondary",
-                            title="Fullscreen",
-                        ),
-                        dbc.Button(
-                            html.I(id="icon-theme", className="fa-solid fa-moon"),
-                            id="btn-theme-switch",
-                            className="me-2 p-0 text-secondary",
-                            color="link",
-                            title="Theme",
-                            n_clicks=0,
-                        ),
-                    ],
-                    id="icon-buttons",
-                    style={"display": "flex", "alignItems": "center"},
-                    className="pt-1",
-                ),
-            ],
-            id="header-container",
-            style={
-                "display": "flex",
-                "flexDirection": "row",
-                "alignItems": "flex-start",
-                "fontFamily": "'Roboto', sans-serif",
-            },
-            className="container",
-        ),
-        html.Div(
+
+def download_links():
+    return [
+        html.Li(
             [
-                html.Div(
-                    [
-                        dbc.Progress(
-                            value=0,
-                            style={"height": "4px"},
-                            color="primary",
-                            className="mb-1 w-100",
-                            id="id-counter",
-                        ),
-                    ],
-                    className="my-0 py-0 pb-1",
-                    id="slider-plot-container",
-                ),
-                html.Div(
-                    [
-                        html.Div(
-                            [
-                                html.Div(
-                                    [
-                                        dbc.Button(
-                                            html.I(id="icon-prev"),
-                                            className="rounded-pill btn-link px-0 col",
-                                            id="prev",
-                                            color="link",
-                                            n_clicks=0,
-                                        ),
-                                        dbc.Button(
-                                            html.I(id="icon-next"),
-                                            className="rounded-pill btn-link px-0 col my-0 py-0",
-                                            id="next",
-                                            color="link",
-                                            n_clicks=0,
-                                        ),
-                                    ],
-                                    className="row py-0 my-0 flex",
-                                ),
-                                html.Div(
-                                    [
-                                        html.Div(
-                                            [
-                                                html.Small(
-                                                    id="count-plot",
-                                                    className="text-start mx-3 fw-bold my-0 py-0",
-                                                    style={"fontSize": "10px"},
+                f"{label}: ",
+                *[
+                    html.A(
+                        fmt.upper(),
+                        href=app.get_relative_path(f"/downloads/{name}.{fmt}"),
+                        className="me-2",
+                    )
+                    for fmt in downloads.available_formats()
+                ],
+            ]
+        )
+        for name, (label, _) in downloads.SOURCES.items()
+    ]
+
+
+def serve_layout():
+    return dbc.Container(
+        [
+            dcc.Store(id="theme-store", data="light"),
+            dcc.Store(id="slide-index", data=0),
+            dcc.Store(id="slide-count", data=len(SLIDES)),
+            dcc.Store(id="slide-cache", data={"0": get_payload(0)}),
+            dcc.Store(id="slide-request"),
+            dcc.Store(
+                id="figure-source",
+                data={
+                    "base": app.get_relative_path("/figures/"),
+                    "version": slides.payload_version(),
+                },
+            ),
+            dcc.Store(
+                id="template-store",
+                data={name: pio.templates[name].to_plotly_json() for name in TEMPLATES},
+            ),
+            html.Div(
+                [
+                    html.H4(
+                        "Data Reality in Latin America and the Caribbean: Insights and Opportunities",
+                        id="header-title",
+                        style={"fontWeight": "700"},
+                        className="container pt-4 pb-1",
+                    ),
+                    html.Div(
+                        [
+                            dbc.Button(
+                                html.I(className="fa-solid fa-circle-info"),
+                                id="btn-info",
+                                color="link",
+                                className="me-2 p-0 text-secondary",
+                                title="About",
+                            ),
+                            dbc.Button(
+                                html.I(className="fa-solid fa-download"),
+                                id="btn-download",
+                                color="link",
+                                className="me-2 px-1 p-0 text-secondary",
+                                title="Datasets",
+                            ),
+                            dbc.Button(
+                                html.I(className="fa-solid fa-expand"),
+                                id="fullscreen-btn",
+                                color="link",
+                                className="me-2 p-0 text-secondary",
+                                title="Fullscreen",
+                            ),
+                            dbc.Button(
+                                html.I(id="icon-theme", className="fa-solid fa-sun"),
+                                id="btn-theme-switch",
+                                className="me-2 p-0 text-secondary",
+                                color="link",
+                                title="Theme",
+                                n_clicks=0,
+                            ),
+                        ],
+                        id="icon-buttons",
+                        style={"display": "flex", "alignItems": "center"},
+                        className="pt-1",
+                    ),
+                ],
+                id="header-container",
+                style={
+                    "display": "flex",
+                    "flexDirection": "row",
+                    "alignItems": "flex-start",
+                    "fontFamily": "'Roboto', sans-serif",
+                },
+                className="container",
+            ),
+            html.Div(
+                [
+                    html.Div(
+                        [
+                            dbc.Progress(
+                                value=0,
+                                style={"height": "4px"},
+                                color="primary",
+                                className="mb-1 w-100",
+                                id="id-counter",
+                            ),
+                        ],
+                        className="my-0 py-0 pb-1",
+                        id="slider-plot-container",
+                    ),
+                    html.Div(
+                        [
+                            html.Div(
+                                [
+                                    html.Div(
+                                        [
+                                            dbc.Button(
+                                                html.I(
+                                                    id="icon-prev",
+                                                    className="fa-solid fa-circle-arrow-left fa-xl text-dark",
                                                 ),
-                                            ],
-                                            className="py-0 my-0",
-                                        ),
-                                    ],
-                                    className="d-flex py-0 my-0 container",
-                                    id="sub-controls-container",
-                                ),
-                            ],
-                            className="px-1",
-                        ),
+                                                className="rounded-pill btn-link px-0 col",
+                                                id="prev",
+                                                color="link",
+                                                n_clicks=0,
+                                            ),
+                                            dbc.Button(
+                                                html.I(
+                                                    id="icon-next",
+                                                    className="fa-solid fa-circle-arrow-right fa-3x text-dark",
+                                                ),
+                                                className="rounded-pill btn-link px-0 col my-0 py-0",
+                                                id="next",
+                                                color="link",
+                                                n_clicks=0,
+                                            ),
+                                        ],
+                                        className="row py-0 my-0 flex",
+                                    ),
+                                    html.Div(
+                                        [
+                                            html.Div(
+                                                [
+                                                    html.Small(
+                                                        id="count-plot",
+                                                        className="text-start mx-3 fw-bold my-0 py-0",
+                                                        style={"fontSize": "10px"},
+                                                    ),
+                                                ],
+                                                className="py-0 my-0",
+                                            ),
+                                        ],
+                                        className="d-flex py-0 my-0 container",
+                                        id="sub-controls-container",
+                                    ),
+                                ],
+                                className="px-1",
+                            ),
+                            html.Div(
+                                [
+                                    html.H5(
+                                        id="title-plot",
+                                        className="px-2 my-0 py-0 fw-bold pb-1 pt-1",
+                                        style={"fontSize": "18px"},
+                                    ),
+                                    html.H6(
+                                        id="sub-title-plot",
+                                        className="px-2 my-0 py-0 text-wrap text-sm-nowrap",
+                                        style={"fontSize": "14px", "width": "900px"},
+                                    ),
+                                ],
+                                className="my-0 px-3",
+                            ),
+                        ],
+                        className="d-flex text-secondary my-0 py-0 container",
+                        id="carousel-container",
+                        style={"width": "100%"},
+                    ),
+                    html.Hr(className="container my-0 py-0 text-seecondary"),
+                ],
+                id="main-content-container",
+                style={
+                    "width": "100%",
+                    "fontFamily": "'Roboto', sans-serif",
+                    "height": "100%",
+                    "width": "100%",
+                    "flexGrow": 1,
+                },
+                className="container pt-2 py-0 my-0 b",
+            ),
+            html.Div(
+                [
+                    dcc.Loading(
                         html.Div(
                             [
-                                html.H5(
-                                    id="title-plot",
-                                    className="px-2 my-0 py-0 fw-bold pb-1 pt-1",
-                                    style={"fontSize": "18px"},
-                                ),
-                                html.H6(
-                                    id="sub-title-plot",
-                                    className="px-2 my-0 py-0 text-wrap text-sm-nowrap",
-                                    style={"fontSize": "14px", "width": "900px"},
-                                ),
-                            ],
-                            className="my-0 px-3",
-                        ),
-                    ],
-                    className="d-flex text-secondary my-0 py-0 container",
-                    id="carousel-container",
-                    style={"width": "100%"},
-                ),
-                html.Hr(className="container my-0 py-0 text-seecondary"),
-            ],
-            id="main-content-container",
-            style={
-                "width": "100%",
-                "fontFamily": "'Roboto', sans-serif",
-                "height": "100%",
-                "width": "100%",
-                "flexGrow": 1,
-            },
-            className="container pt-2 py-0 my-0 b",
-        ),
-        html.Div(
-            [
-                dcc.Loading(
-                    id="id-plots",
-                    color="#018E99",
-                    type="cube",
-                    style={"marginTop": "120px"},
-                )
-            ],
-            id="plot-container",
-            className="container ",
-            style={
-                "height": "100%",
-                "width": "100%",
-                "flexGrow": 1,
-                "overflow": "auto",
-            },
-        ),
-        html.Div(
-            [
-                html.Span(
-                    [
-                        "© - 2025 ",
-                        html.A(
-                            "UD-Git.",
-                            href="https://github.com/U-Danny/GDB_2025",
-                            target="_blank",
-                            style={"color": "inherit", "textDecoration": "underline"},
-                        ),
-                    ],
-                    style={"flex": "1", "textAlign": "left"},
-                ),
-                html.Span(
-                    "Global Data Barometer - Data Visualization Challenge 2025",
-                    style={"flex": "1", "textAlign": "right"},
-                ),
-            ],
-            className="container",
-            style={
-                "fontSize": "12px",
-                "color": "#888",
-                "padding": "8px",
-                "marginTop": "20px",
-                "display": "flex",
-                "justifyContent": "space-between",
-                "alignItems": "center",
-            },
-        ),
-        dbc.Offcanvas(
-            id="info-offcanvas",
-            title="Global Data Barometer - Data Visualization Challenge 2025",
-            placement="start",
-            is_open=False,
-            children=[
-                html.Div(
-                    [
-                        html.P(
-                            [
-                                "The Global Data Barometer (GDB) is an independent project providing a snapshot of the state of data for public good worldwide. ",
-                                html.A(
-                                    "Learn more",
-                                    href="https://globaldatabarometer.org",
-                                    target="_blank",
-                                ),
-                                ".",
-                            ],
-                            className="small",
-                        ),
-                        html.H6("How to use this tool:", className="small fw-bold"),
-                        html.Ul(
-                            [
-                                html.Li(
-                                    [
-                                        "Press the ",
-                                        html.Span("▶️ forward", className="fw-bold"),
-                                        " and ",
-                                        html.Span("◀️ back", className="fw-bold"),
-                                        " buttons to navigate between visualizations.",
-                                    ]
-                                ),
-                                html.Li(
-                                    [
-                                        "Click ",
-                                        html.Span("⬇️ Download", className="fw-bold"),
-                                        " to access datasets.",
-                                    ]
-                                ),
-                                html.Li(
-                                    [
-                                        "Use the ",
-                                        html.Span(
-                                            "🌙 / ☀️ theme toggle", className="fw-bold"
-                                        ),
-                                        " for better readability.",
-                                    ]
-                                ),
-                                html.Li(
-                                    [
-                                        "Click ",
-                                        html.Span("⛶ Fullscreen", className="fw-bold"),
-                                        " for immersive visualization.",
-                                    ]
-                                ),
-                                html.Li(
-                                    [
-                                        "Charts are ",
-                                        html.Span("interactive", className="fw-bold"),
-                                        ": zoom, hover, and explore data details.",
-                                    ]
-                                ),
-                            ],
-                            className="small",
-                        ),
-                        html.P(
-                            "Official results are available directly within this platform.",
-                            className="small",
-                        ),
-                        html.P(
-                            [
-                                "Built with ",
-                                html.Span("Dash", className="fw-bold"),
-                                " and ",
-                                html.Span("Plotly Python", className="fw-bold"),
-                                " for interactive data visualization.",
+                                dcc.Graph(
+                                    id="slide-graph",
+                                    config=config,
+                                    style={"height": "100%", "width": "100%"},
+                                )
                             ],
-                            className="small",
+                            className="flex-grow-1 d-flex overflow-auto p-2",
+                            style={"height": "100%", "width": "100%"},
                         ),
-                    ]
-                )
-            ],
-        ),
-        dbc.Modal(
-            id="download-modal",
-            size="lg",
-            is_open=False,
-            centered=True,
-            children=[
-                dbc.ModalHeader(dbc.ModalTitle("Download Dataset", className="small")),
-                dbc.ModalBody(
+                        id="id-plots",
+                        color="#018E99",
+                        type="cube",
+                        style={"marginTop": "120px"},
+                    )
+                ],
+                id="plot-container",
+                className="container ",
+                style={
+                    "height": "100%",
+                    "width": "100%",
+                    "flexGrow": 1,
+                    "overflow": "auto",
+                },
+            ),
+            html.Div(
+                [
+                    html.Span(
+                        [
+                            "© - 2025 ",
+                            html.A(
+                                "UD-Git.",
+                                href="https://github.com/U-Danny/GDB_2025",
+                                target="_blank",
+                                style={
+                                    "color": "inherit",
+                                    "textDecoration": "underline",
+                                },
+                            ),
+                        ],
+                        style={"flex": "1", "textAlign": "left"},
+                    ),
+                    html.Span(
+                        "Global Data Barometer - Data Visualization Challenge 2025",
+                        style={"flex": "1", "textAlign": "right"},
+                    ),
+                ],
+                className="container",
+                style={
+                    "fontSize": "12px",
+                    "color": "#888",
+                    "padding": "8px",
+                    "marginTop": "20px",
+                    "display": "flex",
+                    "justifyContent": "space-between",
+                    "alignItems": "center",
+                },
+            ),
+            dbc.Offcanvas(
+                id="info-offcanvas",
+                title="Global Data Barometer - Data Visualization Challenge 2025",
+                placement="start",
+                is_open=False,
+                children=[
                     html.Div(
                         [
+                            html.P(
+                                [
+                                    "The Global Data Barometer (GDB) is an independent project providing a snapshot of the state of data for public good worldwide. ",
+                                    html.A(
+                                        "Learn more",
+                                        href="https://globaldatabarometer.org",
+                                        target="_blank",
+                                    ),
+                                    ".",
+                                ],
+                                className="small",
+                            ),
+                            html.H6("How to use this tool:", className="small fw-bold"),
                             html.Ul(
                                 [
                                     html.Li(
-                                        "Global Data Barometer’s data exploration hub"
+                                        [
+                                            "Press the ",
+                                            html.Span(
+                                                "▶️ forward", className="fw-bold"
+                                            ),
+                                            " and ",
+                                            html.Span("◀️ back", className="fw-bold"),
+                                            " buttons to navigate between visualizations.",
+                                        ]
                                     ),
-                                    html.Ul(
+                                    html.Li(
                                         [
-                                            html.Li("Result by country"),
-                                            html.Li("Data by Region"),
-                                            html.Li("General scores"),
+                                            "Click ",
+                                            html.Span(
+                                                "⬇️ Download", className="fw-bold"
+                                            ),
+                                            " to access datasets.",
                                         ]
                                     ),
-                                    html.Br(),
-                                    html.Li("World Bank’s Open Data"),
-                                    html.Ul(
+                                    html.Li(
                                         [
-                                            html.Li(
-                                                html.A(
-                                                    "Individuals using the Internet",
-                                                    href="https://data.worldbank.org/indicator/IT.NET.USER.ZS",
-                                                    target="_blank",
-                                                )
+                                            "Use the ",
+                                            html.Span(
+                                                "🌙 / ☀️ theme toggle",
+                                                className="fw-bold",
                                             ),
+                                            " for better readability.",
                                         ]
                                     ),
-                                    html.Br(),
-                                    html.Li("Transparency International"),
-                                    html.Ul(
+                                    html.Li(
                                         [
-                                            html.Li(
-                                                html.A(
-                                                    "Corruption Perceptions Index",
-                                                    href="https://www.transparency.org/en/cpi/2024/index/dnk",
-                                                    target="_blank",
-                                                )
+                                            "Click ",
+                                            html.Span(
+                                                "⛶ Fullscreen", className="fw-bold"
                                             ),
+                                            " for immersive visualization.",
                                         ]
                                     ),
-                                ]
-                            )
-                        ],
-                        className="small",
-                    )
-                ),
-                dbc.ModalFooter(
-                    dbc.Alert(
-                        [
-                            "Global Data Barometer – To download, please visit the official site: ",
-                            html.A(
-                                "globaldatabarometer.org/explore-the-results/",
-                                href="https://globaldatabarometer.org/explore-the-results/",
-                                target="_blank",
-                                className="alert-link",
+                                    html.Li(
+                                        [
+                                            "Charts are ",
+                                            html.Span(
+                                                "interactive", className="fw-bold"
+                                            ),
+                                            ": zoom, hover, and explore data details.",
+                                        ]
+                                    ),
+                                ],
+                                className="small",
                             ),
-                        ],
-                        color="warning",
-                        className="mb-0 w-100 small",
-                        dismissable=False,
+                            html.P(
+                                "Official results are available directly within this platform.",
+                                className="small",
+                            ),
+                            html.P(
+                                [
+                                    "Built with ",
+                                    html.Span("Dash", className="fw-bold"),
+                                    " and ",
+                                    html.Span("Plotly Python", className="fw-bold"),
+                                    " for interactive data visualization.",
+                                ],
+                                className="small",
+                            ),
+                        ]
                     )
-                ),
-            ],
-        ),
-    ],
-    fluid=True,
-    id="page-container",
-    style={
-        "backgroundColor": "#f8f9fa",
-        "color": "#212529",
-        "minHeight": "100vh",
-        "maxHeight": "180vh",
-        "fontFamily": "'Roboto', sans-serif",
-        "height": "100%",
-        "width": "100%",
-        "flexGrow": 1,
-    },
-)
+                ],
+            ),
+            dbc.Modal(
+                id="download-modal",
+                size="lg",
+                is_open=False,
+                centered=True,
+                children=[
+                    dbc.ModalHeader(
+                        dbc.ModalTitle("Download Dataset", className="small")
+                    ),
+                    dbc.ModalBody(
+                        html.Div(
+                            [
+                                html.Ul(
+                                    [
+                                        html.Li("This dashboard"),
+                                        html.Ul(download_links()),
+                                        html.Br(),
+                                        html.Li(
+                                            "Global Data Barometer’s data exploration hub"
+                                        ),
+                                        html.Ul(
+                                            [
+                                                html.Li("Result by country"),
+                                                html.Li("Data by Region"),
+                                                html.Li("General scores"),
+                                            ]
+                                        ),
+                                        html.Br(),
+                                        html.Li("World Bank’s Open Data"),
+                                        html.Ul(
+                                            [
+                                                html.Li(
+                                                    html.A(
+                                                        "Individuals using the Internet",
+                                                        href="https://data.worldbank.org/indicator/IT.NET.USER.ZS",
+                                                        target="_blank",
+                                                    )
+                                                ),
+                                            ]
+                                        ),
+                                        html.Br(),
+                                        html.Li("Transparency International"),
+                                        html.Ul(
+                                            [
+                                                html.Li(
+                                                    html.A(
+                                                        "Corruption Perceptions Index",
+                                                        href="https://www.transparency.org/en/cpi/2024/index/dnk",
+                                                        target="_blank",
+                                                    )
+                                                ),
+                                            ]
+                                        ),
+                                    ]
+                                )
+                            ],
+                            className="small",
+                        )
+                    ),
+                    dbc.ModalFooter(
+                        dbc.Alert(
+                            [
+                                "Global Data Barometer – To download, please visit the official site: ",
+                                html.A(
+                                    "globaldatabarometer.org/explore-the-results/",
+                                    href="https://globaldatabarometer.org/explore-the-results/",
+                                    target="_blank",
+                                    className="alert-link",
+                                ),
+                            ],
+                            color="warning",
+                            className="mb-0 w-100 small",
+                            dismissable=False,
+                        )
+                    ),
+                ],
+            ),
+        ],
+        fluid=True,
+        id="page-container",
+        style={
+            "backgroundColor": "#f8f9fa",
+            "color": "#212529",
+            "minHeight": "100vh",
+            "maxHeight": "180vh",
+            "fontFamily": "'Roboto', sans-serif",
+            "height": "100%",
+            "width": "100%",
+            "flexGrow": 1,
+        },
+    )
+
 
+app.layout = serve_layout
 
-@app.callback(
+
+# Navigation runs in the browser (assets/navigation.js). The figures for the
+# current slide and its neighbours are kept in slide-cache, so prev/next only
+# re-render from that store; preload_slides fetches whatever the client asks
+# for through slide-request ahead of time from GET /figures, which browsers
+# and proxies can cache.
+app.clientside_callback(
+    ClientsideFunction(namespace="navigation", function_name="navigate"),
     [
-        Output("id-plots", "children"),
-        Output("title-plot", "children"),
-        Output("sub-title-plot", "children"),
+        Output("slide-index", "data"),
+        Output("slide-request", "data"),
         Output("prev", "disabled"),
         Output("next", "disabled"),
         Output("count-plot", "children"),
-        Output("prev", "n_clicks"),
-        Output("next", "n_clicks"),
         Output("id-counter", "value"),
-        Output("page-container", "style"),
-        Output("header-title", "style"),
-        Output("icon-prev", "className"),
-        Output("icon-next", "className"),
-        Output("icon-theme", "className"),
     ],
     [
         Input("prev", "n_clicks"),
         Input("next", "n_clicks"),
-        Input("btn-theme-switch", "n_clicks"),
-        Input("btn-info", "n_clicks"),
-        Input("btn-download", "n_clicks"),
     ],
     [
-        State("prev", "n_clicks"),
-        State("next", "n_clicks"),
-        State("id-counter", "value"),
-        State("page-container", "style"),
-        State("header-title", "style"),
+        State("slide-index", "data"),
+        State("slide-count", "data"),
+        State("slide-cache", "data"),
     ],
 )
-def update_ui(
-    prev_clicks,
-    next_clicks,
-    switch_value,
-    info_clicks,
-    download_clicks,
-    prev_state,
-    next_state,
-    progress_val,
-    page_style,
-    header_style,
-):
-    if switch_value is None:
-        switch_value = 0
-    theme = "light" if switch_value % 2 == 0 else "dark"
-    template = "plotly_dark" if theme == "dark" else "plotly"
-    plots = get_plots(template)
-    max_index = len(plots) - 1
-
-    trigger_id = ctx.triggered_id
-    index = int(round((progress_val / 100) * len(plots))) - 1 if progress_val else 0
-    index = max(0, min(index, max_index))
 
-    if trigger_id == "next" and index < max_index:
-        index += 1
-    elif trigger_id == "prev" and index > 0:
-        index -= 1
-
-    active_prev = index == 0
-    active_next = index == max_index
-
-    progreso_porcentual = ((index + 1) / len(plots)) * 100
-    count_text = f"{index + 1} of {len(plots)}"
-
-    page_bg = "#121212" if theme == "dark" else "#f8f9fa"
-    text_color = "white" if theme == "dark" else "#212529"
+app.clientside_callback(
+    ClientsideFunction(namespace="navigation", function_name="render_slide"),
+    [
+        Output("slide-graph", "figure"),
+        Output("title-plot", "children"),
+        Output("sub-title-plot", "children"),
+    ],
+    [
+        Input("slide-index", "data"),
+        Input("slide-cache", "data"),
+        Input("theme-store", "data"),
+    ],
+    State("template-store", "data"),
+)
 
-    new_page_style = page_style.copy() if page_style else {}
-    new_page_style.update({"backgroundColor": page_bg, "color": text_color})
 
-    new_header_style = header_style.copy() if header_style else {}
-    new_header_style.update({"color": text_color, "fontWeight": "700"})
+app.clientside_callback(
+    ClientsideFunction(namespace="navigation", function_name="preload_slides"),
+    Output("slide-cache", "data"),
+    Input("slide-request", "data"),
+    [
+        State("slide-cache", "data"),
+        State("figure-source", "data"),
+    ],
+    prevent_initial_call=True,
+)
 
-    prev_class = f"fa-solid fa-circle-arrow-left fa-xl {'text-white' if theme == 'dark' else 'text-dark'}"
-    next_class = f"fa-solid fa-circle-arrow-right fa-3x {'text-white' if theme == 'dark' else 'text-dark'}"
-    icon_theme = "fa-solid fa-moon" if theme == "dark" else "fa-solid fa-sun"
 
-    return (
-        html.Div(
-            [
-                dcc.Graph(
-                    figure=plots[index][0],
-                    config=config,
-                    style={"height": "100%", "width": "100%"},
-                )
-            ],
-            className="flex-grow-1 d-flex overflow-auto p-2",
-            style={"height": "100%", "width": "100%"},
-        ),
-        plots[index][1],
-        plots[index][2],
-        active_prev,
-        active_next,
-        count_text,
-        prev_clicks,
-        next_clicks,
-        progreso_porcentual,
-        new_page_style,
-        new_header_style,
-        prev_class,
-        next_class,
-        icon_theme,
-    )
+# Theme switching runs entirely in the browser (assets/theme.js): it restyles
+# the page and updates theme-store, which makes render_slide swap
+# layout.template on the figure already on screen. A toggle costs no server
+# round-trip.
+app.clientside_callback(
+    ClientsideFunction(namespace="theme", function_name="switch_theme"),
+    [
+        Output("theme-store", "data"),
+        Output("page-container", "style"),
+        Output("header-title", "style"),
+        Output("icon-prev", "className"),
+        Output("icon-next", "className"),
+        Output("icon-theme", "className"),
+    ],
+    Input("btn-theme-switch", "n_clicks"),
+    [
+        State("page-container", "style"),
+        State("header-title", "style"),
+    ],
+    prevent_initial_call=True,
+)
 
 
-@app.callback(
+# The info offcanvas and the download modal open and close in the browser
+# (assets/panels.js), so the page needs no server-side callback at all.
+app.clientside_callback(
+    ClientsideFunction(namespace="panels", function_name="toggle"),
     Output("info-offcanvas", "is_open"),
     Input("btn-info", "n_clicks"),
     State("info-offcanvas", "is_open"),
 )
-def toggle_info_offcanvas(n_clicks, is_open):
-    if n_clicks:
-        return not is_open
-    return is_open
-
 
-@app.callback(
+app.clientside_callback(
+    ClientsideFunction(namespace="panels", function_name="toggle"),
     Output("download-modal", "is_open"),
     Input("btn-download", "n_clicks"),
     State("download-modal", "is_open"),
 )
-def toggle_download_modal(n_clicks, is_open):
-    if n_clicks:
-        return not is_open
-    return is_open
 
 
 server = app.server
+slides.use_assets_url(app.get_asset_url(""))
+# The map's stand-in for Plotly's CDN world topojson (see viz.geometry).
+config["topojsonURL"] = geometry.topojson_url(app.get_asset_url(""))
+
+# Registered before compression so its after_request hook runs last and
+# records the size actually sent.
+if metrics.ENABLED:
+    metrics.register(server)
+if payload.COMPRESS:
+    payload.register_compression(server)
+if profiling.ENABLED or profiling.TOKEN:
+    profiling.register(server)
+downloads.register(server)
+bundle.register(server)
+if telemetry.ENABLED:
+    telemetry.register(server)
+
+
+@server.route("/healthz/ready")
+def healthz_ready():
+    if slides.ready.is_set():
+        return {"status": "ready"}, 200
+    return {"status": "warming-up"}, 503
+
+
+# Payloads carry no template, so one URL per slide serves both themes. The
+# themed URL is still answered for pages loaded before the theme was dropped.
+@server.route("/figures/<int:slide>.json")
+@server.route("/figures/<int:slide>/<theme>.json")
+def figure_json(slide, theme="light"):
+    if theme not in THEMES or not 0 <= slide < len(SLIDES):
+        abort(404)
+    etag = slides.payload_etag(slide)
+    # Weak comparison: the compressed body is sent with the tag marked weak.
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        response = Response(slides.get_payload_json(slide), mimetype="application/json")
+    response.set_etag(etag)
+    response.cache_control.public = True
+    if request.args.get("v") == slides.payload_version():
+        response.cache_control.max_age = 365 * 24 * 3600
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.max_age = FIGURE_MAX_AGE
+    return response
+
+
+# pandas, plotly.express, the viz modules and the datasets are loaded when the
+# first slide is built; GDB_LAZY_IMPORTS=0 loads them before the app starts.
+if os.environ.get("GDB_LAZY_IMPORTS", "1") == "0":
+    slides.load()
+
+# GDB_WARMUP=1 pre-builds every slide for both templates before the module
+# finishes importing, so a worker never serves a cold request. With
+# GDB_WARMUP_BACKGROUND=1 the build runs on a background thread instead and
+# /healthz/ready answers 503 until it is done.
+if os.environ.get("GDB_WARMUP", "0") == "1":
+    slides.start_warm_up(
+        threads=int(os.environ.get("GDB_WARMUP_THREADS", "0")),
+        background=os.environ.get("GDB_WARMUP_BACKGROUND", "0") == "1",
+    )
+else:
+    slides.ready.set()
 
 if __name__ == "__main__":
     app.run(debug=True)
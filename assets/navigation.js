@@ -0,0 +1,142 @@
+// Number of slides on each side of the current one kept in slide-cache.
+const PRELOAD_RADIUS = 1;
+// Attempts per slide fetch; network errors and 5xx answers are retried.
+const MAX_ATTEMPTS = 3;
+const RETRY_DELAY = 500;
+
+let renderedSlide = null;
+// Every payload fetched so far. Concurrent preloads each start from their own
+// copy of slide-cache, so results are merged from here to not drop any.
+const fetchedSlides = {};
+// Slides that could not be fetched, as {error: message}. navigate requests
+// them again when they are next needed, and render_slide shows the error.
+const failedSlides = {};
+
+async function fetchSlide(url) {
+    for (let attempt = 1; ; attempt++) {
+        let retry = true;
+        try {
+            const response = await fetch(url);
+            if (response.ok) {
+                return await response.json();
+            }
+            retry = response.status >= 500;
+            throw new Error(`HTTP ${response.status}`);
+        } catch (err) {
+            if (!retry || attempt >= MAX_ATTEMPTS) {
+                throw err;
+            }
+            await new Promise((resolve) => setTimeout(resolve, RETRY_DELAY * attempt));
+        }
+    }
+}
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    navigation: {
+        navigate: function (prev_clicks, next_clicks, index, count, cache) {
+            const triggered = window.dash_clientside.callback_context.triggered.map(
+                (t) => t.prop_id
+            );
+            index = index || 0;
+            if (triggered.includes("next.n_clicks") && index < count - 1) {
+                index += 1;
+            } else if (triggered.includes("prev.n_clicks") && index > 0) {
+                index -= 1;
+            }
+
+            const missing = [];
+            for (let i = index - PRELOAD_RADIUS; i <= index + PRELOAD_RADIUS; i++) {
+                const slide = cache && cache[String(i)];
+                if (i >= 0 && i < count && (!slide || slide.error)) {
+                    missing.push(i);
+                }
+            }
+
+            return [
+                index,
+                missing.length ? missing : window.dash_clientside.no_update,
+                index === 0,
+                index === count - 1,
+                `${index + 1} of ${count}`,
+                ((index + 1) / count) * 100,
+            ];
+        },
+
+        // Payloads are the same for both themes (render_slide applies the
+        // template), so a theme switch fetches nothing again.
+        preload_slides: async function (requested, cache, source) {
+            if (!requested || !requested.length) {
+                return window.dash_clientside.no_update;
+            }
+            const results = await Promise.allSettled(
+                requested.map((index) =>
+                    fetchSlide(`${source.base}${index}.json?v=${source.version}`)
+                )
+            );
+            results.forEach((result, i) => {
+                const key = String(requested[i]);
+                if (result.status === "fulfilled") {
+                    fetchedSlides[key] = result.value;
+                    delete failedSlides[key];
+                } else {
+                    console.error(`Could not load slide ${requested[i]}:`, result.reason);
+                    failedSlides[key] = { error: String(result.reason.message || result.reason) };
+                }
+            });
+            return Object.assign({}, cache, failedSlides, fetchedSlides);
+        },
+
+        render_slide: function (index, cache, theme, templates) {
+            const no_update = window.dash_clientside.no_update;
+            const slide = cache && cache[String(index)];
+            if (!slide) {
+                // Not preloaded yet; this callback fires again once it lands in slide-cache.
+                return [no_update, no_update, no_update];
+            }
+
+            const template = theme === "dark" ? "plotly_dark" : "plotly";
+            if (slide.error) {
+                // Rendered again once a later fetch of this slide succeeds.
+                renderedSlide = null;
+                return [
+                    {
+                        data: [],
+                        layout: {
+                            template: templates[template],
+                            xaxis: { visible: false },
+                            yaxis: { visible: false },
+                            annotations: [
+                                {
+                                    text: "This slide could not be loaded.",
+                                    showarrow: false,
+                                    font: { size: 16 },
+                                },
+                            ],
+                        },
+                    },
+                    "Slide unavailable",
+                    `Loading it failed (${slide.error}). Move to another slide and back to try again, or reload the page.`,
+                ];
+            }
+
+            const key = `${index}:${theme}`;
+            const triggered = window.dash_clientside.callback_context.triggered.map(
+                (t) => t.prop_id
+            );
+            if (key === renderedSlide && triggered.every((p) => p === "slide-cache.data")) {
+                return [no_update, no_update, no_update];
+            }
+            renderedSlide = key;
+
+            if (window.gdbTelemetry) {
+                window.gdbTelemetry.renderStarted(index, theme === "dark" ? "dark" : "light");
+            }
+            const figure = Object.assign({}, slide.figure, {
+                layout: Object.assign({}, slide.figure.layout, {
+                    template: templates[template],
+                }),
+            });
+            return [figure, slide.title, slide.description];
+        },
+    },
+});
@@ -0,0 +1,7 @@
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    panels: {
+        toggle: function (n_clicks, is_open) {
+            return n_clicks ? !is_open : is_open;
+        },
+    },
+});
@@ -0,0 +1,157 @@
+// Client performance telemetry: time to first graph, slide render time after
+// navigation or a theme switch, and Web Vitals, sent in batches to
+// /telemetry with navigator.sendBeacon (see telemetry.py).
+(function () {
+    const FLUSH_INTERVAL = 10000;
+    const MAX_BATCH = 20;
+
+    const queue = [];
+    let pendingRender = null;
+    let firstGraph = false;
+    let graphDiv = null;
+    let finished = false;
+    let lcp = 0;
+    let cls = 0;
+    let inp = 0;
+    let longTasks = 0;
+
+    function endpoint() {
+        let prefix = "/";
+        try {
+            const config = document.getElementById("_dash-config");
+            prefix = JSON.parse(config.textContent).requests_pathname_prefix || "/";
+        } catch (e) {}
+        return prefix + "telemetry";
+    }
+
+    function record(name, value, extra) {
+        if (!isFinite(value) || value < 0) {
+            return;
+        }
+        queue.push(Object.assign({ name: name, value: Math.round(value * 10) / 10 }, extra));
+        if (queue.length >= MAX_BATCH) {
+            flush();
+        }
+    }
+
+    function flush() {
+        const batch = queue.splice(0);
+        if (batch.length && navigator.sendBeacon) {
+            navigator.sendBeacon(endpoint(), JSON.stringify({ metrics: batch }));
+        }
+    }
+
+    function afterPlot() {
+        const now = performance.now();
+        if (!firstGraph) {
+            firstGraph = true;
+            record("first_graph", now);
+        }
+        if (pendingRender) {
+            record("render", now - pendingRender.start, {
+                slide: pendingRender.slide,
+                theme: pendingRender.theme,
+            });
+            pendingRender = null;
+        }
+    }
+
+    function watchGraph() {
+        const gd = document.querySelector("#slide-graph .js-plotly-plot");
+        if (gd && gd !== graphDiv && gd.on) {
+            graphDiv = gd;
+            gd.on("plotly_afterplot", afterPlot);
+        }
+        return graphDiv;
+    }
+
+    function observe(type, callback, options) {
+        try {
+            new PerformanceObserver((list) => list.getEntries().forEach(callback)).observe(
+                Object.assign({ type: type, buffered: true }, options)
+            );
+        } catch (e) {
+            // Entry type not supported by this browser.
+        }
+    }
+
+    observe("paint", (entry) => {
+        if (entry.name === "first-contentful-paint") {
+            record("fcp", entry.startTime);
+        }
+    });
+    observe("largest-contentful-paint", (entry) => {
+        lcp = entry.renderTime || entry.loadTime || entry.startTime;
+    });
+    observe("layout-shift", (entry) => {
+        if (!entry.hadRecentInput) {
+            cls += entry.value;
+        }
+    });
+    observe(
+        "event",
+        (entry) => {
+            if (entry.interactionId) {
+                inp = Math.max(inp, entry.duration);
+            }
+        },
+        { durationThreshold: 40 }
+    );
+    observe("longtask", (entry) => {
+        longTasks += entry.duration;
+    });
+
+    const navigation = performance.getEntriesByType("navigation")[0];
+    if (navigation) {
+        record("ttfb", navigation.responseStart);
+    }
+
+    // The graph and the fullscreen button are created by React after load.
+    const watcher = new MutationObserver(() => {
+        const button = document.getElementById("fullscreen-btn");
+        if (button && button.dataset.fullscreenBound === "true") {
+            record("fullscreen_bind", performance.now());
+            button.dataset.fullscreenBound = "reported";
+        }
+        if (watchGraph() && button && button.dataset.fullscreenBound === "reported") {
+            watcher.disconnect();
+        }
+    });
+    watcher.observe(document.documentElement, {
+        childList: true,
+        subtree: true,
+        attributes: true,
+        attributeFilter: ["data-fullscreen-bound"],
+    });
+
+    function finish() {
+        if (!finished) {
+            finished = true;
+            if (lcp) {
+                record("lcp", lcp);
+            }
+            if (inp) {
+                record("inp", inp);
+            }
+            record("cls", cls);
+            record("long_tasks", longTasks);
+        }
+        flush();
+    }
+
+    document.addEventListener("visibilitychange", () => {
+        if (document.visibilityState === "hidden") {
+            finish();
+        }
+    });
+    window.addEventListener("pagehide", finish);
+    setInterval(flush, FLUSH_INTERVAL);
+
+    // Called by navigation.render_slide whenever it hands a new figure over.
+    window.gdbTelemetry = {
+        renderStarted: function (slide, theme) {
+            pendingRender = { slide: slide, theme: theme, start: performance.now() };
+            watchGraph();
+        },
+    };
+})();
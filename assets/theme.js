@@ -0,0 +1,24 @@
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    theme: {
+        switch_theme: function (n_clicks, page_style, header_style) {
+            const theme = (n_clicks || 0) % 2 === 0 ? "light" : "dark";
+            const text_color = theme === "dark" ? "white" : "#212529";
+            const icon_color = theme === "dark" ? "text-white" : "text-dark";
+
+            return [
+                theme,
+                Object.assign({}, page_style, {
+                    backgroundColor: theme === "dark" ? "#121212" : "#f8f9fa",
+                    color: text_color,
+                }),
+                Object.assign({}, header_style, {
+                    color: text_color,
+                    fontWeight: "700",
+                }),
+                `fa-solid fa-circle-arrow-left fa-xl ${icon_color}`,
+                `fa-solid fa-circle-arrow-right fa-3x ${icon_color}`,
+                theme === "dark" ? "fa-solid fa-moon" : "fa-solid fa-sun",
+            ];
+        },
+    },
+});
@@ -0,0 +1,83 @@
+import json
+import os
+import re
+
+import dash_bootstrap_components as dbc
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+FONT_LINK = "https://fonts.googleapis.com/css2?family=Roboto&display=swap"
+DBC_TEMPLATES = (
+    "https://cdn.jsdelivr.net/gh/AnnMarieW/dash-bootstrap-templates/dbc.min.css"
+)
+
+# Third-party stylesheets, in cascade order. They are served from the local
+# bundle built by scripts/build_assets.py when it exists, and from their CDNs
+# otherwise.
+SOURCES = [
+    dbc.themes.BOOTSTRAP,
+    FONT_LINK,
+    DBC_TEMPLATES,
+    dbc.icons.FONT_AWESOME,
+    dbc.icons.BOOTSTRAP,
+]
+# Only the glyphs of these stylesheets' icon fonts that the UI uses are kept.
+ICON_SOURCES = [dbc.icons.FONT_AWESOME, dbc.icons.BOOTSTRAP]
+
+VENDOR_DIR = os.path.join(BASE_DIR, "assets", "vendor")
+MANIFEST = os.path.join(VENDOR_DIR, "manifest.json")
+# The bundle is linked explicitly, ahead of assets/custom.css, instead of
+# being picked up (after it) by Dash's assets scan, which matches file names.
+ASSETS_IGNORE = r"^bundle\.[0-9a-f]{10}\.css$"
+USE_BUNDLE = os.environ.get("GDB_ASSET_BUNDLE", "1") == "1"
+# Everything in the bundle is named after its content hash.
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+def package(url):
+    match = re.search(r"/npm/((?:@[^/]+/)?[^@/]+)@", url)
+    return match.group(1) if match else url
+
+
+def dedupe(urls):
+    # The same npm package at two versions counts once; the first one wins.
+    seen = set()
+    unique = []
+    for url in urls:
+        if package(url) not in seen:
+            seen.add(package(url))
+            unique.append(url)
+    return unique
+
+
+def load_manifest():
+    try:
+        with open(MANIFEST) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def stylesheets(assets_url="/assets/"):
+    # assets_url is the app's (app.get_asset_url("")), prefix included.
+    manifest = load_manifest() if USE_BUNDLE else None
+    # A bundle built from another list of sources is stale; use the CDNs.
+    if manifest is None or manifest.get("sources") != SOURCES:
+        return list(SOURCES)
+    return [f"{assets_url}{manifest['stylesheet']}"]
+
+
+def register(server):
+    from flask import request
+
+    @server.after_request
+    def cache_bundle(response):
+        if (
+            request.path.startswith("/assets/vendor/")
+            and not request.path.endswith("/manifest.json")
+            and response.status_code in (200, 304)
+        ):
+            response.headers["Cache-Control"] = IMMUTABLE
+        return response
+
+    return cache_bundle
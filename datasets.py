@@ -0,0 +1,221 @@
+import functools
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import weakref
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DATASETS = {
+    "map": os.path.join(BASE_DIR, "Datasets", "map_indicators.csv"),
+    "areas": os.path.join(BASE_DIR, "Datasets", "areas_score.csv"),
+}
+
+# Parsed datasets are stored here as one .npy file per column, so every worker
+# can memory-map the same pages instead of holding a private parsed copy.
+# Set GDB_DATA_CACHE_DIR to an empty string to always parse the CSVs.
+CACHE_DIR = os.environ.get(
+    "GDB_DATA_CACHE_DIR", os.path.join(BASE_DIR, "Datasets", ".cache")
+)
+# Bump when the on-disk layout or the load-time coercion changes.
+CACHE_FORMAT = 1
+
+# Columns kept as text; every other column is coerced to numeric at load time so
+# the viz modules never have to call pd.to_numeric themselves.
+TEXT_COLUMNS = {"iso3", "country"}
+
+_derived = {}
+_derived_lock = threading.Lock()
+
+
+# numpy and pandas are only needed to parse or load frames: computing the data
+# version (source_hashes) must not import them.
+@functools.lru_cache(maxsize=None)
+def _numpy():
+    import numpy
+
+    return numpy
+
+
+@functools.lru_cache(maxsize=None)
+def _pandas():
+    import pandas
+
+    return pandas
+
+
+def file_hash(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_csv(name, path=None):
+    pd = _pandas()
+    df = pd.read_csv(path or DATASETS[name], sep=";")
+    for column in df.columns:
+        if column not in TEXT_COLUMNS:
+            df[column] = pd.to_numeric(df[column], errors="coerce")
+    return df
+
+
+def freeze(columns):
+    np, pd = _numpy(), _pandas()
+    arrays = {}
+    for column, values in columns.items():
+        values = np.asarray(values)
+        if values.dtype.kind == "U":
+            values = values.astype(object)
+        values.setflags(write=False)
+        arrays[column] = values
+    # copy=False keeps each column backed by its (possibly memory-mapped)
+    # read-only array; writes through the frame raise instead of copying.
+    return pd.DataFrame(arrays, copy=False)
+
+
+# Derived data (normalised columns, sort orders) is computed once per shared
+# frame and key, and dropped together with the frame.
+def derived(df, key, build):
+    with _derived_lock:
+        cache = _derived.get(id(df))
+        if cache is None:
+            cache = _derived[id(df)] = {}
+            weakref.finalize(df, _derived.pop, id(df), None)
+    if key not in cache:
+        cache[key] = build(df)
+    return cache[key]
+
+
+def _manifest_path(name):
+    return os.path.join(CACHE_DIR, f"{name}.json")
+
+
+def _read_manifest(name):
+    try:
+        with open(_manifest_path(name)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_manifest(name, manifest):
+    fd, tmp = tempfile.mkstemp(dir=CACHE_DIR, suffix=".json")
+    with os.fdopen(fd, "w") as f:
+        json.dump(manifest, f)
+    os.replace(tmp, _manifest_path(name))
+
+
+def _source_stat(name):
+    stat = os.stat(DATASETS[name])
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+
+def _convert(name, source_hash):
+    np = _numpy()
+    df = read_csv(name)
+    folder = f"{name}-{source_hash[:12]}-v{CACHE_FORMAT}"
+    target = os.path.join(CACHE_DIR, folder)
+    if not os.path.isdir(target):
+        tmp = tempfile.mkdtemp(dir=CACHE_DIR, prefix=f".{name}-")
+        for position, column in enumerate(df.columns):
+            values = df[column].to_numpy()
+            if values.dtype == object:
+                values = values.astype(str)
+            np.save(os.path.join(tmp, f"{position}.npy"), values)
+        try:
+            os.rename(tmp, target)
+        except OSError:
+            # Another worker finished the same conversion first.
+            shutil.rmtree(tmp, ignore_errors=True)
+    return {
+        "format": CACHE_FORMAT,
+        "hash": source_hash,
+        "folder": folder,
+        "columns": df.columns.tolist(),
+        **_source_stat(name),
+    }
+
+
+def _cleanup(name, keep):
+    for entry in os.listdir(CACHE_DIR):
+        if entry.startswith(f"{name}-") and entry != keep:
+            shutil.rmtree(os.path.join(CACHE_DIR, entry), ignore_errors=True)
+
+
+def _load_columns(manifest):
+    np = _numpy()
+    folder = os.path.join(CACHE_DIR, manifest["folder"])
+    return freeze(
+        {
+            column: np.load(os.path.join(folder, f"{position}.npy"), mmap_mode="r")
+            for position, column in enumerate(manifest["columns"])
+        }
+    )
+
+
+def sync(name):
+    manifest = _read_manifest(name)
+    if manifest and manifest.get("format") == CACHE_FORMAT:
+        if all(manifest.get(k) == v for k, v in _source_stat(name).items()):
+            return manifest
+        source_hash = file_hash(DATASETS[name])
+        if manifest.get("hash") == source_hash:
+            # Touched but unchanged: only refresh the recorded stat.
+            manifest.update(_source_stat(name))
+            _write_manifest(name, manifest)
+            return manifest
+    else:
+        source_hash = file_hash(DATASETS[name])
+    manifest = _convert(name, source_hash)
+    _write_manifest(name, manifest)
+    _cleanup(name, manifest["folder"])
+    return manifest
+
+
+def load(name):
+    if CACHE_DIR:
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            manifest = sync(name)
+            return _load_columns(manifest), manifest["hash"]
+        except OSError:
+            pass
+    df = read_csv(name)
+    frame = freeze({column: df[column].to_numpy() for column in df.columns})
+    return frame, file_hash(DATASETS[name])
+
+
+def load_all():
+    frames, hashes = {}, {}
+    for name in DATASETS:
+        frames[name], hashes[name] = load(name)
+    return frames, hashes
+
+
+def source_hashes():
+    # The same hashes as load_all(), without loading anything: from the cache
+    # manifest when the source is unchanged since it was written.
+    hashes = {}
+    for name in DATASETS:
+        manifest = _read_manifest(name) if CACHE_DIR else None
+        if (
+            manifest
+            and manifest.get("format") == CACHE_FORMAT
+            and all(manifest.get(k) == v for k, v in _source_stat(name).items())
+        ):
+            hashes[name] = manifest["hash"]
+        else:
+            hashes[name] = file_hash(DATASETS[name])
+    return hashes
+
+
+def version(hashes):
+    digest = hashlib.sha1()
+    for name in sorted(hashes):
+        digest.update(hashes[name].encode())
+    return digest.hexdigest()[:12]
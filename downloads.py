@@ -0,0 +1,184 @@
+import contextlib
+import importlib.util
+import os
+import tempfile
+
+import datasets
+import slides
+
+# Optional, Parquet downloads answer 501 without it. Imported on first use.
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+# Exports are written here once per dataset version and format, then served
+# as files (ranges, conditional GET, chunked reads). Set GDB_DOWNLOAD_DIR to
+# an empty string to stream every download straight from the frame instead.
+DOWNLOAD_DIR = os.environ.get(
+    "GDB_DOWNLOAD_DIR",
+    os.path.join(datasets.BASE_DIR, "Datasets", ".cache", "downloads"),
+)
+# Rows converted at a time, so an export never holds more than one chunk of
+# text in memory.
+CHUNK_ROWS = 10000
+# Derived columns (ratios, normalised scores) are rounded to this many
+# decimals, so the files carry no float noise such as 10.959999999999999.
+DECIMALS = 6
+# Bump when the content of an export changes for the same data.
+EXPORT_VERSION = 2
+
+FORMATS = {
+    "csv": "text/csv",
+    "json": "application/json",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# What can be downloaded: the two source datasets and, for every slide built
+# from them, the frame the chart is drawn from (with its normalised columns).
+SOURCES = {
+    "map": ("Map indicators", lambda: slides.frames()["map"]),
+    "areas": ("Action area scores", lambda: slides.frames()["areas"]),
+    "heat_area_action": (
+        "Action areas by country",
+        lambda: _derived("heat_area_action"),
+    ),
+    "internet_access": (
+        "Internet access and action areas",
+        lambda: _derived("internet_access"),
+    ),
+    "cpi_bar": (
+        "Corruption Perceptions Index and transparency areas",
+        lambda: _derived("cpi_bar"),
+    ),
+}
+
+
+def _derived(slide):
+    # Keyed by slide name, like the frames the viz modules derive themselves.
+    return datasets.derived(
+        slides.frames()["areas"], slide, slides.viz(slide).normalize
+    )
+
+
+def available_formats():
+    return [fmt for fmt in FORMATS if fmt != "parquet" or HAS_PYARROW]
+
+
+def etag(name, fmt):
+    return f"{name}-{fmt}-{slides.payload_version()}-v{EXPORT_VERSION}"
+
+
+def _chunks(df):
+    for start in range(0, len(df), CHUNK_ROWS):
+        yield df.iloc[start : start + CHUNK_ROWS].round(DECIMALS)
+
+
+def iter_csv(df):
+    header = True
+    for chunk in _chunks(df):
+        yield chunk.to_csv(index=False, header=header).encode()
+        header = False
+    if header:
+        yield df.iloc[:0].to_csv(index=False).encode()
+
+
+def iter_json(df):
+    yield b"["
+    separator = b""
+    for chunk in _chunks(df):
+        records = chunk.to_json(orient="records")[1:-1]
+        if records:
+            yield separator + records.encode()
+            separator = b","
+    yield b"]"
+
+
+def write_parquet(df, path):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for chunk in _chunks(df):
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+        if writer is None:
+            pq.write_table(pa.Table.from_pandas(df, preserve_index=False), path)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def export(name, fmt):
+    # Returns the path of the export for the current data, writing it first if
+    # needed. Older versions of the same export are removed.
+    filename = f"{etag(name, fmt)}.{fmt}"
+    path = os.path.join(DOWNLOAD_DIR, filename)
+    if os.path.exists(path):
+        return path
+    os.makedirs(DOWNLOAD_DIR, exist_ok=True)
+    df = SOURCES[name][1]()
+    fd, tmp = tempfile.mkstemp(dir=DOWNLOAD_DIR, suffix=".tmp")
+    try:
+        if fmt == "parquet":
+            os.close(fd)
+            write_parquet(df, tmp)
+        else:
+            rows = iter_csv(df) if fmt == "csv" else iter_json(df)
+            with os.fdopen(fd, "wb") as f:
+                f.writelines(rows)
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+    for entry in os.listdir(DOWNLOAD_DIR):
+        if entry.startswith(f"{name}-{fmt}-") and entry != filename:
+            with contextlib.suppress(OSError):
+                os.remove(os.path.join(DOWNLOAD_DIR, entry))
+    return path
+
+
+def register(server):
+    from flask import Response, abort, request, send_file
+
+    @server.route("/downloads/<name>.<fmt>")
+    def download(name, fmt):
+        if name not in SOURCES or fmt not in FORMATS:
+            abort(404)
+        if fmt not in available_formats():
+            abort(501, "Parquet downloads need the pyarrow package.")
+        tag = etag(name, fmt)
+        filename = f"{name}.{fmt}"
+
+        if DOWNLOAD_DIR:
+            try:
+                path = export(name, fmt)
+            except OSError:
+                path = None
+            if path is not None:
+                return send_file(
+                    path,
+                    mimetype=FORMATS[fmt],
+                    as_attachment=True,
+                    download_name=filename,
+                    etag=tag,
+                    conditional=True,
+                    max_age=0,
+                )
+
+        # No export directory: stream from the frame, without range support.
+        if request.if_none_match.contains(tag):
+            response = Response(status=304)
+        elif fmt == "parquet":
+            abort(501, "Parquet downloads need GDB_DOWNLOAD_DIR.")
+        else:
+            df = SOURCES[name][1]()
+            rows = iter_csv(df) if fmt == "csv" else iter_json(df)
+            response = Response(rows, mimetype=FORMATS[fmt])
+            response.headers["Content-Disposition"] = (
+                f'attachment; filename="{filename}"'
+            )
+        response.set_etag(tag)
+        return response
+
+    return download
@@ -0,0 +1,108 @@
+import contextlib
+import os
+import tempfile
+import zlib
+
+try:
+    import fcntl
+except ImportError:  # not on Windows; workers may then build the same figure
+    fcntl = None
+
+from datasets import BASE_DIR
+
+# Serialized slide payloads shared by every worker on the host and kept across
+# restarts. Set GDB_FIGURE_CACHE_DIR to an empty string to keep figures in
+# each process only.
+CACHE_DIR = os.environ.get(
+    "GDB_FIGURE_CACHE_DIR", os.path.join(BASE_DIR, "Datasets", ".cache", "figures")
+)
+# Least recently used entries are evicted above this size.
+MAX_BYTES = int(os.environ.get("GDB_FIGURE_CACHE_MB", "64")) * 1024 * 1024
+# Keys share this many lock files, so new data or code versions add no more.
+# Two keys on one stripe only build one after the other.
+LOCK_STRIPES = 32
+
+
+class DiskCache:
+    # Any object with get(key), set(key, data) and lock(key) can stand in for
+    # this one (see slides.shared_cache); values are bytes.
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        # The modification time doubles as the recency used for eviction.
+        with contextlib.suppress(OSError):
+            os.utime(path)
+        return data
+
+    def set(self, key, data):
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, self._path(key))
+        self._evict()
+
+    def _evict(self):
+        entries = [
+            entry
+            for entry in os.scandir(self.directory)
+            if entry.name.endswith(".json")
+        ]
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        total = sum(entry.stat().st_size for entry in entries)
+        for entry in entries[:-1]:
+            if total <= self.max_bytes:
+                break
+            total -= entry.stat().st_size
+            with contextlib.suppress(OSError):
+                os.remove(entry.path)
+
+    @contextlib.contextmanager
+    def lock(self, key):
+        if fcntl is None:
+            yield
+            return
+        # crc32 rather than hash(), which differs between processes.
+        stripe = zlib.crc32(key.encode()) % LOCK_STRIPES
+        with open(os.path.join(self.directory, f"stripe-{stripe}.lock"), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def get_or_build(cache, key, build):
+    data = cache.get(key)
+    if data is not None:
+        return data, False
+    # Only one process builds a given key; the others wait here and then find
+    # it on disk.
+    with cache.lock(key):
+        data = cache.get(key)
+        if data is not None:
+            return data, False
+        data = build()
+        cache.set(key, data)
+    return data, True
+
+
+def default():
+    if not CACHE_DIR:
+        return None
+    try:
+        return DiskCache(CACHE_DIR, MAX_BYTES)
+    except OSError:
+        return None
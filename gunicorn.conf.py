@@ -0,0 +1,65 @@
+"""Production gunicorn settings, picked up from the working directory:
+
+    gunicorn            # same as gunicorn -c gunicorn.conf.py wsgi:server
+
+The app is preloaded: wsgi.py is imported once in the master, which loads the
+datasets and builds every slide before the workers are forked, so they start
+warm and share that memory instead of each holding a copy. Every callback runs
+in the browser; workers only answer GETs for the page, assets, /figures and
+/downloads, and the telemetry beacons, which suit a few processes with threads.
+"""
+
+import gc
+import glob
+import multiprocessing
+import os
+import tempfile
+
+wsgi_app = "wsgi:server"
+bind = os.environ.get("GDB_BIND", "0.0.0.0:8050")
+workers = int(
+    os.environ.get("GDB_WORKERS", min(2 * multiprocessing.cpu_count() + 1, 8))
+)
+worker_class = os.environ.get("GDB_WORKER_CLASS", "gthread")
+threads = int(os.environ.get("GDB_THREADS", "4"))
+preload_app = os.environ.get("GDB_PRELOAD", "1") == "1"
+# Recycled workers are forked from the master again, so they start warm too.
+max_requests = int(os.environ.get("GDB_MAX_REQUESTS", "0"))
+max_requests_jitter = max_requests // 10
+timeout = 60
+graceful_timeout = 30
+keepalive = 5
+
+# Every worker writes its metrics here and /metrics reports the sum.
+os.environ.setdefault(
+    "GDB_METRICS_DIR", os.path.join(tempfile.gettempdir(), "gdb-metrics")
+)
+
+if preload_app:
+    # A warm-up thread started in the master would not exist in the workers.
+    os.environ["GDB_WARMUP_BACKGROUND"] = "0"
+
+
+def on_starting(server):
+    # Totals of an earlier run, retired workers' included, would be added to
+    # this one's; the metrics module itself only drops files of dead pids.
+    # The preload has already run, so the master's own file is kept.
+    directory = os.environ["GDB_METRICS_DIR"]
+    own = os.path.join(directory, f"metrics-{os.getpid()}.json")
+    for path in glob.glob(os.path.join(directory, "metrics-*")):
+        if path != own:
+            os.remove(path)
+
+
+def pre_fork(server, worker):
+    # Objects created by the preload are never collected; moving them out of
+    # the collector's generations keeps it from writing to (and so copying)
+    # their pages in every worker.
+    gc.collect()
+    gc.freeze()
+
+
+def child_exit(server, worker):
+    import metrics
+
+    metrics.retire(worker.pid)
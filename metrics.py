@@ -0,0 +1,359 @@
+import atexit
+import contextlib
+import glob
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+ENABLED = os.environ.get("GDB_METRICS", "1") == "1"
+# With several workers (gunicorn), point GDB_METRICS_DIR at a directory
+# shared by all of them: each process writes its own totals there and
+# /metrics sums every file. Without it, /metrics only covers this process.
+METRICS_DIR = os.environ.get("GDB_METRICS_DIR", "")
+FLUSH_INTERVAL = 1.0
+# Totals of workers that exited, folded together by retire().
+RETIRED_FILE = "metrics-retired.json"
+
+LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+CLIENT_BUCKETS = [0.1, 0.25, 0.5, 1.0, 1.5, 2.5, 4.0, 6.0, 10.0, 20.0]
+SHIFT_BUCKETS = [0.01, 0.05, 0.1, 0.15, 0.25, 0.5, 1.0]
+SIZE_BUCKETS = [1024, 4096, 16384, 65536, 262144, 1048576, 4194304]
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, documentation, label, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.label = label
+        self.buckets = buckets
+        self.values = {}
+
+    def observe(self, label_value, value):
+        with _lock:
+            entry = self.values.get(label_value)
+            if entry is None:
+                entry = self.values[label_value] = {
+                    "buckets": [0] * len(self.buckets),
+                    "sum": 0.0,
+                    "count": 0,
+                }
+            for position, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry["buckets"][position] += 1
+            entry["sum"] += value
+            entry["count"] += 1
+        _dirty.set()
+
+    @contextmanager
+    def time(self, label_value):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(label_value, time.perf_counter() - start)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, documentation, label):
+        self.name = name
+        self.documentation = documentation
+        self.label = label
+        self.values = {}
+
+    def inc(self, label_value, amount=1):
+        with _lock:
+            self.values[label_value] = self.values.get(label_value, 0) + amount
+        _dirty.set()
+
+
+_lock = threading.Lock()
+_dirty = threading.Event()
+_flusher = {"pid": None}
+
+callback_seconds = Histogram(
+    "gdb_callback_duration_seconds",
+    "Time spent serving a Dash callback request.",
+    "output",
+    LATENCY_BUCKETS,
+)
+request_seconds = Histogram(
+    "gdb_request_duration_seconds",
+    "Time spent serving a request other than a Dash callback.",
+    "route",
+    LATENCY_BUCKETS,
+)
+builder_seconds = Histogram(
+    "gdb_builder_duration_seconds",
+    "Time spent in a viz graph() builder.",
+    "builder",
+    LATENCY_BUCKETS,
+)
+payload_seconds = Histogram(
+    "gdb_payload_compaction_seconds",
+    "Time spent compacting a figure for the browser.",
+    "builder",
+    LATENCY_BUCKETS,
+)
+response_bytes = Histogram(
+    "gdb_response_size_bytes",
+    "Size of the response body as sent, after compression.",
+    "endpoint",
+    SIZE_BUCKETS,
+)
+cache_lookups = Counter(
+    "gdb_cache_lookups_total",
+    "Slide cache lookups.",
+    "cache",
+)
+cache_misses = Counter(
+    "gdb_cache_misses_total",
+    "Slide cache lookups that had to build.",
+    "cache",
+)
+client_timing_seconds = Histogram(
+    "gdb_client_timing_seconds",
+    "Page load timings reported by browsers (ttfb, fcp, lcp, inp, first graph).",
+    "metric",
+    CLIENT_BUCKETS,
+)
+client_render_seconds = Histogram(
+    "gdb_client_render_seconds",
+    "Time for a browser to draw a slide after navigation or a theme switch.",
+    "slide",
+    CLIENT_BUCKETS,
+)
+client_layout_shift = Histogram(
+    "gdb_client_layout_shift",
+    "Cumulative layout shift reported by browsers.",
+    "metric",
+    SHIFT_BUCKETS,
+)
+
+REGISTRY = [
+    callback_seconds,
+    request_seconds,
+    builder_seconds,
+    payload_seconds,
+    response_bytes,
+    cache_lookups,
+    cache_misses,
+    client_timing_seconds,
+    client_render_seconds,
+    client_layout_shift,
+]
+
+
+def _after_fork():
+    # A forked worker starts from zero; what the master recorded before the
+    # fork stays in the master's own file and is not counted twice.
+    global _lock
+    _lock = threading.Lock()
+    for metric in REGISTRY:
+        metric.values = {}
+    _flusher["pid"] = None
+
+
+os.register_at_fork(after_in_child=_after_fork)
+
+
+def _start():
+    if _flusher["pid"] == os.getpid():
+        return
+    with _lock:
+        if _flusher["pid"] == os.getpid():
+            return
+        _flusher["pid"] = os.getpid()
+    if METRICS_DIR:
+        _remove_stale()
+        threading.Thread(target=_flush_loop, name="metrics-flush", daemon=True).start()
+
+
+def _snapshot():
+    with _lock:
+        return {
+            metric.name: {
+                json.dumps(key): value for key, value in metric.values.items()
+            }
+            for metric in REGISTRY
+        }
+
+
+def _path(pid):
+    return os.path.join(METRICS_DIR, f"metrics-{pid}.json")
+
+
+def _running(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _remove_stale():
+    # Files of processes that are gone (an earlier run, or a worker nobody
+    # retired), and one left under this process's pid by an earlier owner,
+    # would otherwise be added to this run's totals for good.
+    for path in glob.glob(_path("*")):
+        pid = os.path.basename(path)[len("metrics-") : -len(".json")]
+        if pid.isdigit() and (int(pid) == os.getpid() or not _running(int(pid))):
+            with contextlib.suppress(OSError):
+                os.remove(path)
+
+
+def _write(path, snapshot):
+    fd, tmp = tempfile.mkstemp(dir=METRICS_DIR, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(snapshot, f)
+    os.replace(tmp, path)
+
+
+def flush():
+    if not METRICS_DIR:
+        return
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    _dirty.clear()
+    _write(_path(os.getpid()), _snapshot())
+
+
+def retire(pid):
+    # Called by the gunicorn master once a worker has exited: its totals are
+    # folded into one file, so /metrics keeps counting them without a file
+    # per recycled worker.
+    if not METRICS_DIR:
+        return
+    try:
+        with open(_path(pid)) as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return
+    totals = {}
+    retired = os.path.join(METRICS_DIR, RETIRED_FILE)
+    with contextlib.suppress(OSError, ValueError):
+        with open(retired) as f:
+            _merge(totals, json.load(f))
+    _merge(totals, snapshot)
+    _write(retired, totals)
+    with contextlib.suppress(OSError):
+        os.remove(_path(pid))
+
+
+def _flush_loop():
+    while True:
+        _dirty.wait()
+        time.sleep(FLUSH_INTERVAL)
+        flush()
+
+
+def _merge(totals, snapshot):
+    for name, values in snapshot.items():
+        merged = totals.setdefault(name, {})
+        for key, value in values.items():
+            if isinstance(value, dict):
+                entry = merged.setdefault(
+                    key,
+                    {"buckets": [0] * len(value["buckets"]), "sum": 0.0, "count": 0},
+                )
+                entry["buckets"] = [
+                    a + b for a, b in zip(entry["buckets"], value["buckets"])
+                ]
+                entry["sum"] += value["sum"]
+                entry["count"] += value["count"]
+            else:
+                merged[key] = merged.get(key, 0) + value
+
+
+def _label(name, value):
+    value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return f'{name}="{value}"'
+
+
+def render():
+    _start()
+    totals = {}
+    if METRICS_DIR:
+        flush()
+        for path in glob.glob(os.path.join(METRICS_DIR, "metrics-*.json")):
+            try:
+                with open(path) as f:
+                    _merge(totals, json.load(f))
+            except (OSError, ValueError):
+                continue
+    else:
+        _merge(totals, _snapshot())
+
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for key, value in sorted(totals.get(metric.name, {}).items()):
+            label = _label(metric.label, json.loads(key))
+            if metric.kind == "counter":
+                lines.append(f"{metric.name}{{{label}}} {value}")
+                continue
+            for bound, count in zip(metric.buckets, value["buckets"]):
+                lines.append(f'{metric.name}_bucket{{{label},le="{bound}"}} {count}')
+            lines.append(f'{metric.name}_bucket{{{label},le="+Inf"}} {value["count"]}')
+            lines.append(f"{metric.name}_sum{{{label}}} {value['sum']}")
+            lines.append(f"{metric.name}_count{{{label}}} {value['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def observe(metric, label_value, value):
+    if ENABLED:
+        _start()
+        metric.observe(label_value, value)
+
+
+def inc(metric, label_value):
+    if ENABLED:
+        _start()
+        metric.inc(label_value)
+
+
+@contextmanager
+def timed(metric, label_value):
+    if not ENABLED:
+        yield
+        return
+    _start()
+    with metric.time(label_value):
+        yield
+
+
+def register(server):
+    from flask import Response, g, request
+
+    @server.before_request
+    def start_timer():
+        g.metrics_start = time.perf_counter()
+
+    @server.after_request
+    def record_request(response):
+        start = g.pop("metrics_start", None)
+        if request.path.endswith("/_dash-update-component"):
+            output = (request.get_json(silent=True) or {}).get("output", "")
+            observe(callback_seconds, output, time.perf_counter() - start)
+        elif request.url_rule is not None:
+            # Slides are preloaded from GET /figures rather than a callback.
+            route = request.url_rule.rule
+            observe(request_seconds, route, time.perf_counter() - start)
+        if request.endpoint is not None and response.content_length is not None:
+            observe(response_bytes, request.endpoint, response.content_length)
+        return response
+
+    @server.route("/metrics")
+    def metrics_endpoint():
+        return Response(render(), mimetype="text/plain; version=0.0.4")
+
+    if METRICS_DIR:
+        atexit.register(flush)
@@ -0,0 +1,239 @@
+import base64
+import functools
+import gzip
+import os
+import threading
+from collections import OrderedDict
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # optional, gzip is always available
+    brotli = None
+
+# Numbers are rounded to this many decimals before they go over the wire;
+# every hovertemplate and tick in the app shows two at most.
+DECIMALS = int(os.environ.get("GDB_PAYLOAD_DECIMALS", "4"))
+# Encode numeric trace arrays as base64 typed arrays (plotly.js >= 2.28).
+BINARY = os.environ.get("GDB_PAYLOAD_BINARY", "0") == "1"
+# Shorter arrays are left as JSON lists, where base64 would not pay off.
+MIN_BINARY_LENGTH = 8
+
+COMPRESS = os.environ.get("GDB_COMPRESS", "1") == "1"
+COMPRESS_MIN_SIZE = 1024
+COMPRESSIBLE_TYPES = {
+    "application/json",
+    "application/javascript",
+    "text/javascript",
+    "text/css",
+    "text/html",
+    "image/svg+xml",
+}
+
+# Downloads are served as files with range support; compressing them would
+# read each one whole into memory.
+UNCOMPRESSED_PREFIXES = ("/downloads/",)
+STATIC_PREFIXES = ("/assets/", "/_dash-component-suites/", "/figures/")
+# Compressed static bodies are kept per worker up to this size; the least
+# recently sent ones are dropped first.
+COMPRESS_CACHE_BYTES = int(os.environ.get("GDB_COMPRESS_CACHE_MB", "16")) * 1024 * 1024
+
+# Trace and axis properties that only restate plotly.js defaults.
+TRACE_DEFAULTS = {"xaxis": "x", "yaxis": "y"}
+AXIS_DEFAULTS = {"domain": [0.0, 1.0]}
+
+_compressed = OrderedDict()
+_compressed_bytes = 0
+_compressed_lock = threading.Lock()
+
+
+# numpy is only needed by the compaction functions, which run when a slide is
+# built; serving prebuilt payloads and compressing responses never import it.
+@functools.lru_cache(maxsize=None)
+def _numpy():
+    import numpy
+
+    return numpy
+
+
+def _is_default(value, default):
+    np = _numpy()
+    if isinstance(value, np.ndarray):
+        return False
+    return value == "" or (default is not None and value == default)
+
+
+def _numeric(value):
+    np = _numpy()
+    if isinstance(value, np.ndarray):
+        array = value
+    elif isinstance(value, (list, tuple)) and value:
+        try:
+            array = np.asarray(value)
+        except ValueError:  # ragged
+            return None
+    else:
+        return None
+    if array.dtype.kind not in "fiu" or array.size == 0:
+        return None
+    return array
+
+
+def _typed_array(array):
+    np = _numpy()
+    if array.dtype.kind == "f":
+        array = array.astype("<f4")
+    elif (
+        array.min() >= np.iinfo(np.int32).min and array.max() <= np.iinfo(np.int32).max
+    ):
+        array = array.astype("<i4")
+    else:
+        array = array.astype("<f8")
+    spec = {
+        "dtype": array.dtype.str[1:],
+        "bdata": base64.b64encode(np.ascontiguousarray(array).tobytes()).decode(),
+    }
+    if array.ndim > 1:
+        spec["shape"] = ", ".join(str(n) for n in array.shape)
+    return spec
+
+
+def _compact(value, binary):
+    np = _numpy()
+    if isinstance(value, dict):
+        return {key: _compact(item, binary) for key, item in value.items()}
+    array = _numeric(value)
+    if array is not None:
+        if binary and array.size >= MIN_BINARY_LENGTH:
+            return _typed_array(array)
+        if array.dtype.kind == "f":
+            array = np.round(array, DECIMALS)
+        return array.tolist()
+    if isinstance(value, (list, tuple)):
+        return [_compact(item, binary) for item in value]
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, float):
+        return round(value, DECIMALS)
+    return value
+
+
+def compact_figure(fig, binary=None, keep_template=False):
+    figure = fig.to_plotly_json()
+    binary = BINARY if binary is None else binary
+
+    data = []
+    for trace in figure.get("data", []):
+        trace = {
+            key: value
+            for key, value in trace.items()
+            if not _is_default(value, TRACE_DEFAULTS.get(key))
+        }
+        data.append(_compact(trace, binary))
+
+    layout = dict(figure.get("layout", {}))
+    if not keep_template:
+        # The browser already holds both templates (template-store) and
+        # applies the current one when it renders the figure.
+        layout.pop("template", None)
+    for key, axis in layout.items():
+        if key.startswith(("xaxis", "yaxis")) and isinstance(axis, dict):
+            layout[key] = {
+                k: v
+                for k, v in axis.items()
+                if not _is_default(v, AXIS_DEFAULTS.get(k))
+            }
+    # Layout arrays (e.g. updatemenu restyle args) stay plain JSON lists.
+    return {"data": data, "layout": _compact(layout, False)}
+
+
+def _encoding():
+    accept = request.accept_encodings
+    if brotli is not None and accept["br"]:
+        return "br"
+    if accept["gzip"]:
+        return "gzip"
+    return None
+
+
+def _compress(data, encoding):
+    if encoding == "br":
+        return brotli.compress(data, quality=5)
+    return gzip.compress(data, compresslevel=6)
+
+
+def _cached(key):
+    with _compressed_lock:
+        body = _compressed.get(key)
+        if body is not None:
+            _compressed.move_to_end(key)
+        return body
+
+
+def _cache(key, body):
+    global _compressed_bytes
+    if len(body) > COMPRESS_CACHE_BYTES:
+        return
+    with _compressed_lock:
+        if key in _compressed:
+            return
+        _compressed[key] = body
+        _compressed_bytes += len(body)
+        while _compressed_bytes > COMPRESS_CACHE_BYTES:
+            _, old = _compressed.popitem(last=False)
+            _compressed_bytes -= len(old)
+
+
+def register_compression(server):
+    @server.after_request
+    def compress_response(response):
+        if response.status_code == 304:
+            # Revalidating a compressed body, whose ETag was sent as weak.
+            tag, weak = response.get_etag()
+            if (
+                tag
+                and not weak
+                and not request.if_none_match.contains(tag)
+                and request.if_none_match.contains_weak(tag)
+            ):
+                response.set_etag(tag, weak=True)
+            return response
+        if (
+            response.status_code != 200
+            or response.mimetype not in COMPRESSIBLE_TYPES
+            or "Content-Encoding" in response.headers
+            or request.path.startswith(UNCOMPRESSED_PREFIXES)
+        ):
+            return response
+        encoding = _encoding()
+        if encoding is None:
+            return response
+        response.vary.add("Accept-Encoding")
+
+        # Static files (assets, component suites, figures) are fingerprinted or
+        # carry an ETag, so their compressed body is computed once per worker.
+        static = request.path.startswith(STATIC_PREFIXES)
+        tag = response.get_etag()[0]
+        key = (request.path, tag, encoding) if static else None
+        body = _cached(key) if key is not None else None
+        if body is not None:
+            response.close()
+        else:
+            response.direct_passthrough = False
+            data = response.get_data()
+            if len(data) < COMPRESS_MIN_SIZE:
+                return response
+            body = _compress(data, encoding)
+            if key is not None:
+                _cache(key, body)
+
+        response.direct_passthrough = False
+        response.set_data(body)
+        response.headers["Content-Encoding"] = encoding
+        # Not byte-identical to the uncompressed body that has the strong tag.
+        if tag:
+            response.set_etag(tag, weak=True)
+        return response
+
+    return compress_response
@@ -0,0 +1,185 @@
+import cProfile
+import collections
+import contextlib
+import hmac
+import itertools
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+
+# GDB_PROFILE=1 profiles every callback request (and every slide build done
+# outside a request, e.g. warm-up). With only GDB_PROFILE_TOKEN set, a single
+# request is profiled when it carries the token in the X-GDB-Profile header or
+# the ?profile= query parameter. With neither set nothing is registered.
+ENABLED = os.environ.get("GDB_PROFILE", "0") == "1"
+TOKEN = os.environ.get("GDB_PROFILE_TOKEN", "")
+# "sample" writes folded stacks (flamegraph.pl, speedscope, inferno);
+# "cprofile" writes deterministic pstats files (snakeviz, gprof2dot).
+MODE = os.environ.get("GDB_PROFILE_MODE", "sample")
+PROFILE_DIR = os.environ.get(
+    "GDB_PROFILE_DIR", os.path.join(tempfile.gettempdir(), "gdb-profiles")
+)
+# Oldest profiles beyond this count are deleted after each write.
+KEEP = int(os.environ.get("GDB_PROFILE_KEEP", "100"))
+SAMPLE_INTERVAL = 0.001
+
+_local = threading.local()
+_sequence = itertools.count()
+_prune_lock = threading.Lock()
+
+
+class Sampler:
+    extension = "folded"
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = collections.Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="profile-sampler", daemon=True
+        )
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                filename = os.path.basename(code.co_filename)
+                stack.append(f"{code.co_name} ({filename}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def save(self, path):
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class Deterministic:
+    extension = "prof"
+
+    def __init__(self, thread_id):
+        self.profile = cProfile.Profile()
+
+    def start(self):
+        self.profile.enable()
+
+    def stop(self):
+        self.profile.disable()
+
+    def save(self, path):
+        self.profile.dump_stats(path)
+
+
+PROFILERS = {"sample": Sampler, "cprofile": Deterministic}
+
+
+def _filename(label, extension):
+    label = re.sub(r"[^A-Za-z0-9._-]+", "_", label).strip("_")[:80]
+    stamp = time.strftime("%Y%m%dT%H%M%S")
+    return f"{stamp}-{os.getpid()}-{next(_sequence)}-{label}.{extension}"
+
+
+def _prune():
+    with _prune_lock:
+        entries = [
+            entry
+            for entry in os.scandir(PROFILE_DIR)
+            if entry.name.endswith((".folded", ".prof"))
+        ]
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in entries[: max(len(entries) - KEEP, 0)]:
+            with contextlib.suppress(OSError):
+                os.remove(entry.path)
+
+
+def begin(label):
+    # Nested calls (a slide build inside a profiled request) are covered by
+    # the outer profile.
+    if getattr(_local, "session", None) is not None:
+        return None
+    profiler = PROFILERS[MODE](threading.get_ident())
+    _local.session = (profiler, label)
+    profiler.start()
+    return _local.session
+
+
+def end(session):
+    if session is None:
+        return None
+    profiler, label = session
+    profiler.stop()
+    _local.session = None
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    path = os.path.join(PROFILE_DIR, _filename(label, profiler.extension))
+    profiler.save(path)
+    _prune()
+    return path
+
+
+@contextlib.contextmanager
+def _profiled(label):
+    session = begin(label)
+    try:
+        yield
+    finally:
+        end(session)
+
+
+def profiled(label):
+    if not ENABLED:
+        return contextlib.nullcontext()
+    return _profiled(label)
+
+
+def _request_label(request):
+    body = request.get_json(silent=True) if request.is_json else None
+    if not body:
+        return request.path
+    values = [
+        item.get("value")
+        for item in body.get("inputs", []) + body.get("state", [])
+        if isinstance(item, dict)
+    ]
+    values = [
+        "_".join(map(str, value)) if isinstance(value, list) else str(value)
+        for value in values
+        if isinstance(value, (str, int, float, list))
+    ]
+    return "-".join([body.get("output", "callback"), *values])
+
+
+def register(server):
+    from flask import g, request
+
+    def requested():
+        if ENABLED:
+            return request.path.endswith("/_dash-update-component") or (
+                request.path.startswith("/figures/")
+            )
+        supplied = request.headers.get("X-GDB-Profile") or request.args.get(
+            "profile", ""
+        )
+        return bool(supplied) and hmac.compare_digest(supplied.encode(), TOKEN.encode())
+
+    @server.before_request
+    def start_profile():
+        if requested():
+            g.profile = begin(_request_label(request))
+
+    @server.teardown_request
+    def stop_profile(exc):
+        end(g.pop("profile", None))
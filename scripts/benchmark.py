@@ -0,0 +1,264 @@
+"""Benchmark the viz builders and the slide figure route on synthetic data.
+
+    python scripts/benchmark.py [--countries 20 200 2000] [--indicators 20 100]
+                                [--repeat 3] [--save PATH] [--compare PATH]
+
+The synthetic datasets follow the schemas of Datasets/map_indicators.csv and
+Datasets/areas_score.csv. For every size it reports wall time (median of
+--repeat runs), peak traced memory and the serialized figure size of each
+builder, plus GET /figures/<slide>.json served by Flask for all slides
+from a cold and a warm cache. Cold runs get new frame objects each time, so
+derived data the builders cache per frame (datasets.derived) is computed in
+every measured run; warm_seconds is the same build with that data cached. --save writes the results as JSON; --compare
+prints the change against a saved baseline.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import datasets  # noqa: E402
+import payload  # noqa: E402
+import slides  # noqa: E402
+from viz import (  # noqa: E402
+    choroplet_score,
+    cpi_bar,
+    heat_area_action,
+    internet_access,
+    summary,
+)
+
+DEFAULT_OUTPUT = os.path.join(".benchmarks", "baseline.json")
+# Slower or bigger than this ratio against the baseline is flagged.
+REGRESSION_RATIO = 1.2
+
+BUILDERS = {
+    "choroplet_score": lambda data, template: choroplet_score.graph(
+        data["map"], template=template
+    ),
+    "heat_area_action": lambda data, template: heat_area_action.graph(
+        data["areas"], template=template
+    ),
+    "internet_access": lambda data, template: internet_access.graph(
+        data["areas"], template=template
+    ),
+    "cpi_bar": lambda data, template: cpi_bar.graph(data["areas"], template=template),
+    "summary": lambda data, template: summary.graph(template=template),
+}
+
+
+def columns_like(known, count, prefix):
+    columns = list(known[:count])
+    columns += [f"{prefix} {i}" for i in range(len(columns), count)]
+    return columns
+
+
+def synthetic(countries, indicators, seed=0):
+    rng = np.random.default_rng(seed)
+    names = np.array([f"Country {i:04d}" for i in range(countries)], dtype=object)
+    codes = np.array([f"C{i:04d}" for i in range(countries)], dtype=object)
+
+    map_columns = {"iso3": codes, "country": names}
+    for column in columns_like(
+        list(choroplet_score.INDICATORS.values()), indicators, "Indicator"
+    ):
+        map_columns[column] = np.round(rng.uniform(0, 100, countries), 2)
+
+    real = datasets.read_csv("areas")
+    known = [c for c in real.columns if c not in ("country", "cpi", "internet_access")]
+    areas_columns = {
+        "country": names,
+        "cpi": np.round(rng.uniform(10, 90, countries), 0),
+        "internet_access": np.round(rng.uniform(50, 100, countries), 1),
+    }
+    for column in columns_like(known, indicators, "Area"):
+        areas_columns[column] = np.round(rng.uniform(0, 100, countries), 2)
+
+    return {
+        "map": datasets.freeze(map_columns),
+        "areas": datasets.freeze(areas_columns),
+    }
+
+
+def fresh(data):
+    # New frames over the same read-only columns: nothing derived from the old
+    # ones is found in datasets.derived, which is keyed on the frame.
+    return {
+        name: datasets.freeze({column: df[column].to_numpy() for column in df})
+        for name, df in data.items()
+    }
+
+
+def timed(function, repeat, setup=tuple):
+    # setup() runs untimed before every call and returns its arguments. One
+    # untimed run first, so lazy imports and first-call setup in Plotly do not
+    # land in the measurement.
+    function(*setup())
+    times = []
+    for _ in range(repeat):
+        args = setup()
+        start = time.perf_counter()
+        result = function(*args)
+        times.append(time.perf_counter() - start)
+    return result, statistics.median(times)
+
+
+def peak_memory(function, setup=tuple):
+    args = setup()
+    tracemalloc.start()
+    try:
+        function(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_builders(data, template, repeat):
+    results = {}
+    for name, builder in BUILDERS.items():
+
+        def build(frames):
+            return builder(frames, template)[0]
+
+        fig, seconds = timed(build, repeat, lambda: (fresh(data),))
+        _, warm_seconds = timed(lambda: build(data), repeat)
+        results[name] = {
+            "seconds": seconds,
+            "warm_seconds": warm_seconds,
+            "peak_bytes": peak_memory(build, lambda: (fresh(data),)),
+            "figure_bytes": len(fig.to_json()),
+            "payload_bytes": len(json.dumps(payload.compact_figure(fig))),
+        }
+    return results
+
+
+def bench_figures(data, repeat):
+    import app
+
+    client = app.server.test_client()
+
+    def call():
+        body = b""
+        for index in range(len(slides.SLIDES)):
+            response = client.get(f"/figures/{index}.json")
+            assert response.status_code == 200, response.status_code
+            body += response.get_data()
+        return body
+
+    def cold(frames):
+        slides.use_datasets(frames["map"], frames["areas"], "benchmark", shared=False)
+        return call()
+
+    response, cold_seconds = timed(cold, repeat, lambda: (fresh(data),))
+    _, warm_seconds = timed(call, repeat)
+    return {
+        "figures": {
+            "seconds": cold_seconds,
+            "warm_seconds": warm_seconds,
+            "peak_bytes": peak_memory(cold, lambda: (fresh(data),)),
+            "response_bytes": len(response),
+        }
+    }
+
+
+def run(countries, indicators, template, repeat):
+    results = {}
+    for count in countries:
+        for indicator_count in indicators:
+            key = f"{count}x{indicator_count}"
+            data = synthetic(count, indicator_count)
+            results[key] = bench_builders(data, template, repeat)
+            results[key].update(bench_figures(data, repeat))
+            print_results(key, results[key])
+    return results
+
+
+def print_results(key, results):
+    print(f"\n{key} (countries x indicators)")
+    print(
+        f"  {'target':<18}{'cold ms':>10}{'warm ms':>10}{'peak KiB':>12}{'bytes':>12}"
+    )
+    for name, values in results.items():
+        size = values.get("figure_bytes", values.get("response_bytes"))
+        print(
+            f"  {name:<18}{values['seconds'] * 1000:>10.1f}"
+            f"{values['warm_seconds'] * 1000:>10.1f}"
+            f"{values['peak_bytes'] / 1024:>12.0f}{size:>12}"
+        )
+
+
+def compare(results, baseline):
+    print(f"\nagainst baseline (flagged above x{REGRESSION_RATIO})")
+    for key, targets in results.items():
+        for name, values in targets.items():
+            previous = baseline.get(key, {}).get(name)
+            if not previous:
+                continue
+            ratios = {
+                metric: values[metric] / previous[metric]
+                for metric in (
+                    "seconds",
+                    "warm_seconds",
+                    "peak_bytes",
+                    "figure_bytes",
+                    "response_bytes",
+                )
+                if previous.get(metric)
+            }
+            flag = (
+                " <-- regression"
+                if any(r > REGRESSION_RATIO for r in ratios.values())
+                else ""
+            )
+            print(
+                f"  {key:<10}{name:<18}"
+                + "".join(
+                    f"{metric} x{ratio:.2f}  " for metric, ratio in ratios.items()
+                )
+                + flag
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--countries", type=int, nargs="+", default=[20, 200, 2000])
+    parser.add_argument("--indicators", type=int, nargs="+", default=[20, 100])
+    parser.add_argument("--template", default="plotly", choices=slides.TEMPLATES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save", nargs="?", const=DEFAULT_OUTPUT, metavar="PATH")
+    parser.add_argument("--compare", nargs="?", const=DEFAULT_OUTPUT, metavar="PATH")
+    args = parser.parse_args()
+
+    results = run(args.countries, args.indicators, args.template, args.repeat)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f)["results"])
+    if args.save:
+        os.makedirs(os.path.dirname(args.save) or ".", exist_ok=True)
+        with open(args.save, "w") as f:
+            json.dump(
+                {
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "template": args.template,
+                    "repeat": args.repeat,
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+        print(f"\nsaved {args.save}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""Build the self-hosted stylesheet bundle under assets/vendor/.
+
+    python scripts/build_assets.py
+
+Downloads the stylesheets in bundle.SOURCES (Bootstrap, Roboto, the dbc
+templates, Font Awesome and Bootstrap Icons), drops duplicate packages, and
+rewrites them into one minified, content-hashed assets/vendor/bundle.<hash>.css
+with the fonts next to it. Icon rules and icon font glyphs are cut down to the
+fa-*/bi-* classes found in app.py, viz/ and assets/*.js; re-run the script after
+using a new icon. Subsetting needs fontTools (pip install fonttools brotli);
+without it the icon fonts are copied whole.
+"""
+
+import argparse
+import glob
+import hashlib
+import io
+import json
+import os
+import re
+import sys
+import urllib.parse
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bundle  # noqa: E402
+
+try:
+    from fontTools import subset
+    from fontTools.ttLib import TTFont
+except ImportError:
+    subset = None
+
+# Google Fonts only serves woff2 to browsers it recognises.
+USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+)
+SCANNED = ["app.py", "viz/*.py", "assets/*.js"]
+ICON_CLASS = re.compile(r"\b((?:fa|bi)-[a-z0-9-]+)")
+ICON_SELECTOR = re.compile(r"^\.((?:fa|bi)-[a-z0-9-]+)(?:::?before)?$")
+ESCAPE = re.compile(r"\\([0-9a-fA-F]{1,6})")
+CHARSET = re.compile(r"@charset\s*(\"[^\"]*\"|'[^']*')\s*;")
+STRING = re.compile(r"(\"(?:[^\"\\]|\\.)*\"|'(?:[^'\\]|\\.)*')")
+URL = re.compile(r"url\(\s*(['\"]?)([^'\")]+)\1\s*\)")
+SRC_ENTRY = re.compile(r"url\([^)]*\)(?:\s*format\([^)]*\))?")
+
+
+def download(url):
+    request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return response.read()
+
+
+def used_icons():
+    icons = set()
+    for pattern in SCANNED:
+        for path in glob.glob(os.path.join(bundle.BASE_DIR, pattern)):
+            with open(path) as f:
+                icons.update(ICON_CLASS.findall(f.read()))
+    return icons
+
+
+def minify(css):
+    parts = STRING.split(css)
+    for i in range(0, len(parts), 2):
+        code = re.sub(r"/\*.*?\*/", "", parts[i], flags=re.S)
+        code = re.sub(r"\s+", " ", code)
+        code = re.sub(r"\s*([{};,>])\s*", r"\1", code)
+        # A space before ":" is a descendant combinator (".a :hover").
+        code = re.sub(r":\s+", ":", code)
+        parts[i] = code.replace(";}", "}")
+    return "".join(parts).strip()
+
+
+def rules(css):
+    # Top-level (prelude, body) pairs; bodies of @media blocks hold rules.
+    position, depth, start = 0, 0, 0
+    prelude = None
+    for match in re.finditer(r"[{}]|" + STRING.pattern, css):
+        token = match.group(0)
+        if token == "{":
+            if depth == 0:
+                prelude = css[start : match.start()].strip()
+                position = match.end()
+            depth += 1
+        elif token == "}":
+            depth -= 1
+            if depth == 0:
+                yield prelude, css[position : match.start()]
+                start = match.end()
+
+
+def prune_icons(css, icons, codepoints):
+    out = []
+    for prelude, body in rules(css):
+        head, _, prelude = prelude.rpartition(";")
+        if head:
+            out.append(head + ";")
+        if prelude.startswith("@media") or prelude.startswith("@supports"):
+            inner = prune_icons(body, icons, codepoints)
+            if inner:
+                out.append(f"{prelude}{{{inner}}}")
+            continue
+        selectors = [s.strip() for s in prelude.split(",")]
+        matches = [ICON_SELECTOR.match(s) for s in selectors]
+        if all(matches) and ("content:" in body or "--fa:" in body):
+            if not any(m.group(1) in icons for m in matches):
+                continue
+            for string in STRING.findall(body):
+                codepoints.update(int(code, 16) for code in ESCAPE.findall(string))
+        out.append(f"{prelude}{{{body}}}")
+    return "".join(out)
+
+
+def fingerprint(name, data):
+    stem, ext = os.path.splitext(os.path.basename(name))
+    return f"{stem}.{hashlib.sha1(data).hexdigest()[:10]}{ext}"
+
+
+def subset_font(data, codepoints):
+    font = TTFont(io.BytesIO(data))
+    options = subset.Options()
+    options.flavor = "woff2"
+    options.layout_features = ["*"]
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=codepoints)
+    subsetter.subset(font)
+    out = io.BytesIO()
+    font.flavor = "woff2"
+    font.save(out)
+    return out.getvalue()
+
+
+def only_woff2(css):
+    # Every browser that runs the app reads woff2; the other formats listed in
+    # @font-face would only be downloaded as separate files.
+    def rewrite(match):
+        entries = SRC_ENTRY.findall(match.group(1))
+        woff2 = [e for e in entries if ".woff2" in e]
+        return f"src:{','.join(woff2 or entries)}"
+
+    return re.sub(r"src:([^;}]*)", rewrite, css)
+
+
+def localise(css, base_url, output, icon_codepoints, written):
+    def replace(match):
+        url = urllib.parse.urljoin(base_url, match.group(2).strip())
+        if url.startswith("data:"):
+            return match.group(0)
+        if url not in written:
+            data = download(url.split("#")[0])
+            name = os.path.basename(urllib.parse.urlsplit(url).path)
+            if icon_codepoints is not None and subset is not None:
+                data = subset_font(data, icon_codepoints)
+                name = os.path.splitext(name)[0] + ".woff2"
+            name = fingerprint(name, data)
+            with open(os.path.join(output, "fonts", name), "wb") as f:
+                f.write(data)
+            written[url] = f"fonts/{name}"
+        return f"url({written[url]})"
+
+    return URL.sub(replace, css)
+
+
+def build(output):
+    os.makedirs(os.path.join(output, "fonts"), exist_ok=True)
+    icons = used_icons()
+    sources = bundle.dedupe(bundle.SOURCES)
+    sheets, written = [], {}
+    for url in sources:
+        print(f"  {url}")
+        # @charset is only valid at the very start of the bundle.
+        css = CHARSET.sub("", minify(download(url).decode()))
+        codepoints = None
+        if url in bundle.ICON_SOURCES:
+            codepoints = set()
+            css = only_woff2(prune_icons(css, icons, codepoints))
+        sheets.append(localise(css, url, output, codepoints, written))
+
+    css = ('@charset "UTF-8";\n' + "\n".join(sheets)).encode()
+    name = fingerprint("bundle.css", css)
+    with open(os.path.join(output, name), "wb") as f:
+        f.write(css)
+
+    # Files from earlier builds are no longer referenced.
+    keep = {name, "manifest.json", *(os.path.basename(p) for p in written.values())}
+    for path in glob.glob(os.path.join(output, "*")) + glob.glob(
+        os.path.join(output, "fonts", "*")
+    ):
+        if os.path.isfile(path) and os.path.basename(path) not in keep:
+            os.remove(path)
+
+    with open(os.path.join(output, "manifest.json"), "w") as f:
+        json.dump(
+            {
+                "stylesheet": f"vendor/{name}",
+                "sources": bundle.SOURCES,
+                "icons": sorted(icons),
+            },
+            f,
+            indent=2,
+        )
+    return name, sorted(icons), written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default=bundle.VENDOR_DIR)
+    args = parser.parse_args()
+
+    if subset is None:
+        print("fontTools is not installed, icon fonts are copied whole")
+    name, icons, fonts = build(args.output)
+    total = sum(
+        os.path.getsize(os.path.join(args.output, p)) for p in [name, *fonts.values()]
+    )
+    print(f"\n{len(icons)} icons: {' '.join(icons)}")
+    print(f"wrote {name} and {len(fonts)} fonts, {total / 1024:.0f} KiB in total")
+
+
+if __name__ == "__main__":
+    main()
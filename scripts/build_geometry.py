@@ -0,0 +1,155 @@
+"""Regenerate the LAC country geometry bundled under assets/geo/.
+
+Reads a Natural Earth admin-0 countries GeoJSON, keeps the Latin America and
+Caribbean features listed in viz.geometry.LAC_ISO3 and writes one
+simplified file per level in viz.geometry.LEVELS, plus the empty world
+topology plotly.js asks for instead of fetching its own from the CDN:
+
+    python scripts/build_geometry.py [--source PATH_OR_URL]
+"""
+
+import argparse
+import json
+import os
+import sys
+import urllib.request
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from viz import geometry  # noqa: E402
+
+SOURCE = (
+    "https://raw.githubusercontent.com/nvkelso/natural-earth-vector/master/"
+    "geojson/ne_110m_admin_0_countries.geojson"
+)
+
+# ~100 m, well below what the map can show at this zoom.
+PRECISION = 3
+
+
+def read_source(source):
+    if source.startswith(("http://", "https://")):
+        with urllib.request.urlopen(source) as response:
+            return json.load(response)
+    with open(source) as f:
+        return json.load(f)
+
+
+def iso3(feature):
+    properties = feature["properties"]
+    code = properties.get("ISO_A3") or properties.get("iso_a3")
+    if not code or code == "-99":
+        code = properties.get("ADM0_A3") or properties.get("adm0_a3")
+    return code
+
+
+def simplify(points, tolerance):
+    if tolerance <= 0 or len(points) < 3:
+        return points
+    keep = np.zeros(len(points), dtype=bool)
+    keep[[0, -1]] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end <= start + 1:
+            continue
+        segment = points[end] - points[start]
+        offsets = points[start + 1 : end] - points[start]
+        length = np.hypot(*segment)
+        if length == 0:
+            distances = np.hypot(offsets[:, 0], offsets[:, 1])
+        else:
+            distances = np.abs(np.cross(segment, offsets)) / length
+        index = int(np.argmax(distances))
+        if distances[index] > tolerance:
+            split = start + 1 + index
+            keep[split] = True
+            stack.extend([(start, split), (split, end)])
+    return points[keep]
+
+
+def simplify_polygon(rings, tolerance):
+    simplified = []
+    for position, ring in enumerate(rings):
+        points = simplify(np.asarray(ring, dtype=float), tolerance)
+        if len(points) < 4:
+            if position > 0:
+                # Holes that collapse are dropped.
+                continue
+            points = np.asarray(ring, dtype=float)
+        simplified.append(np.round(points, PRECISION).tolist())
+    return simplified
+
+
+def simplify_geometry(geometry, tolerance):
+    if geometry["type"] == "Polygon":
+        polygons = [geometry["coordinates"]]
+    else:
+        polygons = geometry["coordinates"]
+    polygons = [simplify_polygon(rings, tolerance) for rings in polygons]
+    if len(polygons) == 1:
+        return {"type": "Polygon", "coordinates": polygons[0]}
+    return {"type": "MultiPolygon", "coordinates": polygons}
+
+
+def build_topojson():
+    topology = {
+        "type": "Topology",
+        "objects": {
+            layer: {"type": "GeometryCollection", "geometries": []}
+            for layer in geometry.TOPOJSON_LAYERS
+        },
+        "arcs": [],
+    }
+    with open(geometry.topojson_path(), "w") as f:
+        json.dump(topology, f, separators=(",", ":"))
+
+
+def build(source, levels):
+    wanted = set(geometry.LAC_ISO3)
+    features = [f for f in read_source(source)["features"] if iso3(f) in wanted]
+    os.makedirs(os.path.dirname(geometry.asset_path("high")), exist_ok=True)
+    for level in levels:
+        tolerance = geometry.LEVELS[level]
+        collection = {
+            "type": "FeatureCollection",
+            "features": [
+                {
+                    "type": "Feature",
+                    "properties": {
+                        "iso3": iso3(feature),
+                        "name": feature["properties"].get("NAME")
+                        or feature["properties"].get("name"),
+                    },
+                    "geometry": simplify_geometry(feature["geometry"], tolerance),
+                }
+                for feature in sorted(features, key=iso3)
+            ],
+        }
+        path = geometry.asset_path(level)
+        with open(path, "w") as f:
+            json.dump(collection, f, separators=(",", ":"))
+        print(f"{level:>6}: {len(features)} features, {os.path.getsize(path)} bytes")
+    missing = sorted(wanted - {iso3(f) for f in features})
+    if missing:
+        print(f"not in source: {', '.join(missing)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", default=SOURCE, help="GeoJSON path or URL")
+    parser.add_argument(
+        "--level",
+        action="append",
+        choices=list(geometry.LEVELS),
+        help="level to build (default: all)",
+    )
+    args = parser.parse_args()
+    build(args.source, args.level or list(geometry.LEVELS))
+    build_topojson()
+
+
+if __name__ == "__main__":
+    main()
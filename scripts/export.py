@@ -0,0 +1,251 @@
+"""Export every slide, in both themes, for one or more dataset editions.
+
+    python scripts/export.py [--dataset DIR ...] [--output exports]
+                             [--format html json png svg] [--workers N] [--force]
+
+Each --dataset directory holds a map_indicators.csv and an areas_score.csv
+(default: Datasets/). Figures are built in a process pool and written to
+OUTPUT/<edition>/<slide>-<theme>.<format>, where <edition> is the directory's
+path below the deepest folder all the editions share (its name, for one
+edition or for sibling directories): self-contained HTML (plotly.js and
+map geometry inlined), the full figure JSON, and PNG/SVG images (these need
+the kaleido package, which reads the map geometry from assets/geo). An output
+is skipped when neither the edition's CSVs nor the code that builds it changed
+since it was written; --force rebuilds all.
+A figure or file that fails is reported at the end, after the rest have been
+written, and the exit status is then 1.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import pathlib
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import datasets  # noqa: E402
+import slides  # noqa: E402
+from viz import geometry  # noqa: E402
+
+FORMATS = ["html", "json", "png", "svg"]
+IMAGE_FORMATS = {"png", "svg"}
+THEMES = {"plotly": "light", "plotly_dark": "dark"}
+MANIFEST = "export-manifest.json"
+
+# Per worker process: the edition whose frames slides currently points at.
+_edition = {"path": None}
+
+
+def edition_files(path):
+    return {
+        name: os.path.join(path, os.path.basename(source))
+        for name, source in datasets.DATASETS.items()
+    }
+
+
+def edition_version(path):
+    files = edition_files(path)
+    return datasets.version({name: datasets.file_hash(f) for name, f in files.items()})
+
+
+def use_edition(path, version):
+    if _edition["path"] == path:
+        return
+    frames = {}
+    for name, source in edition_files(path).items():
+        df = datasets.read_csv(name, source)
+        frames[name] = datasets.freeze({c: df[c].to_numpy() for c in df.columns})
+    slides.use_datasets(frames["map"], frames["areas"], version, shared=False)
+    _edition["path"] = path
+
+
+def inline_geometry(fig):
+    # The app lets the browser fetch the map outline from /assets; an exported
+    # file has no server behind it, so the GeoJSON goes into the figure.
+    for trace in fig.data:
+        geojson = getattr(trace, "geojson", None)
+        if isinstance(geojson, str) and geojson.startswith(slides.ASSETS_URL):
+            path = geojson[len(slides.ASSETS_URL) :]
+            with open(os.path.join(datasets.BASE_DIR, "assets", path)) as f:
+                trace.geojson = json.load(f)
+
+
+def geo_assets():
+    # plotly.js takes the world topojson from this global when it is already
+    # there, instead of fetching it from the CDN (see viz.geometry).
+    topology = json.dumps({geometry.TOPOJSON_NAME: geometry.topojson()})
+    return f"<script>window.PlotlyGeoAssets = {{topojson: {topology}}};</script>"
+
+
+def use_local_topojson():
+    import plotly.io as pio
+
+    # Setting it restarts kaleido, so only once per process.
+    url = pathlib.Path(geometry.topojson_path()).parent.as_uri() + "/"
+    if pio.kaleido.scope.topojson != url:
+        pio.kaleido.scope.topojson = url
+
+
+def write(fig, path, fmt):
+    if fmt == "html":
+        html = fig.to_html(include_plotlyjs=True, full_html=True)
+        if any(trace.type in ("choropleth", "scattergeo") for trace in fig.data):
+            html = html.replace("<head>", "<head>" + geo_assets(), 1)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(html)
+    elif fmt == "json":
+        fig.write_json(path)
+    else:
+        use_local_topojson()
+        fig.write_image(path, format=fmt, width=1280, height=720, scale=2)
+
+
+def describe(error):
+    return f"{type(error).__name__}: {error}".strip()
+
+
+def export_slide(job):
+    # Errors are returned rather than raised, so one failing figure or format
+    # does not stop the rest of the run.
+    path, version, key, index, template, targets = job
+    start = time.perf_counter()
+    written, failed = [], []
+    try:
+        use_edition(path, version)
+        fig = slides.get_slide(index, template)[0]
+        inline_geometry(fig)
+    except Exception as error:
+        failed = [(target, describe(error)) for _, target in targets]
+        return key, written, failed, time.perf_counter() - start
+    for fmt, target in targets:
+        tmp = f"{target}.tmp"
+        try:
+            write(fig, tmp, fmt)
+            os.replace(tmp, target)
+        except Exception as error:
+            with contextlib.suppress(OSError):
+                os.remove(tmp)
+            failed.append((target, describe(error)))
+        else:
+            written.append(target)
+    return key, written, failed, time.perf_counter() - start
+
+
+def load_manifest(output):
+    try:
+        with open(os.path.join(output, MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(output, manifest):
+    tmp = os.path.join(output, f"{MANIFEST}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp, os.path.join(output, MANIFEST))
+
+
+def edition_folders(editions):
+    # Relative to the editions' common root, so 2023/Datasets and
+    # 2024/Datasets do not both end up in Datasets/.
+    paths = list(dict.fromkeys(os.path.abspath(path) for path in editions))
+    root = os.path.commonpath(paths)
+    if root in paths:
+        root = os.path.dirname(root)
+    return {path: os.path.relpath(path, root) for path in paths}
+
+
+def plan(editions, output, formats, manifest, force):
+    jobs, skipped = [], 0
+    for path, edition in edition_folders(editions).items():
+        version = edition_version(path)
+        folder = os.path.join(output, edition)
+        os.makedirs(folder, exist_ok=True)
+        for template, theme in THEMES.items():
+            for index, name in enumerate(slides.SLIDE_NAMES):
+                key = f"{version}-{slides.CODE_VERSION}"
+                targets = []
+                for fmt in formats:
+                    target = os.path.join(folder, f"{name}-{theme}.{fmt}")
+                    relative = os.path.relpath(target, output)
+                    if (
+                        not force
+                        and manifest.get(relative) == key
+                        and os.path.exists(target)
+                    ):
+                        skipped += 1
+                        continue
+                    targets.append((fmt, target))
+                if targets:
+                    jobs.append((path, version, key, index, template, targets))
+    return jobs, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--dataset",
+        nargs="+",
+        default=[os.path.dirname(datasets.DATASETS["map"])],
+        metavar="DIR",
+    )
+    parser.add_argument("--output", default="exports")
+    parser.add_argument("--format", nargs="+", default=FORMATS, choices=FORMATS)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--force", action="store_true")
+    args = parser.parse_args()
+
+    formats = list(dict.fromkeys(args.format))
+    if IMAGE_FORMATS & set(formats):
+        try:
+            import kaleido  # noqa: F401
+        except ImportError:
+            print("kaleido is not installed, skipping png/svg", file=sys.stderr)
+            formats = [fmt for fmt in formats if fmt not in IMAGE_FORMATS]
+
+    os.makedirs(args.output, exist_ok=True)
+    manifest = load_manifest(args.output)
+    jobs, skipped = plan(args.dataset, args.output, formats, manifest, args.force)
+
+    start = time.perf_counter()
+    written, failures, build_seconds = 0, [], 0.0
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            for key, targets, failed, seconds in pool.map(export_slide, jobs):
+                written += len(targets)
+                failures += failed
+                build_seconds += seconds
+                for target in targets:
+                    relative = os.path.relpath(target, args.output)
+                    manifest[relative] = key
+                    print(f"  wrote {relative}")
+                for target, error in failed:
+                    print(f"  failed {os.path.relpath(target, args.output)}")
+    finally:
+        # Whatever was written is recorded, even if the run was interrupted.
+        save_manifest(args.output, manifest)
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"\n{len(jobs)} figures, {written} files written, {skipped} unchanged "
+        f"in {elapsed:.1f}s with {args.workers} workers"
+    )
+    if jobs:
+        print(
+            f"{len(jobs) / elapsed:.1f} figures/s, {written / elapsed:.1f} files/s, "
+            f"{build_seconds / len(jobs):.2f}s per figure in a worker"
+        )
+    if failures:
+        print(f"\n{len(failures)} files failed:", file=sys.stderr)
+        for target, error in failures:
+            print(f"  {os.path.relpath(target, args.output)}: {error}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
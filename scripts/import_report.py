@@ -0,0 +1,106 @@
+"""Report what importing the app costs: time per module and peak memory.
+
+    python scripts/import_report.py [--module app] [--top 20] [--json FILE]
+
+Imports MODULE in a fresh interpreter with -X importtime, with the current
+environment (so e.g. GDB_LAZY_IMPORTS=0 or GDB_WARMUP=1 can be compared), and
+prints the total import time, the slowest top-level packages, the slowest
+modules by self time, which heavy dependencies were loaded and the peak RSS of
+the process. --json also writes the numbers to FILE, to track them over time.
+"""
+
+import argparse
+import json
+import os
+import re
+import resource
+import subprocess
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Dependencies that only slide builds need.
+HEAVY = ["pandas", "numpy", "plotly.express", "pyarrow", "viz"]
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|\s*(\S+)")
+
+
+def measure(module):
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BASE_DIR,
+        capture_output=True,
+        text=True,
+    )
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        sys.exit(result.stderr)
+    modules = []
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            modules.append(
+                {
+                    "name": match.group(3),
+                    "self_us": int(match.group(1)),
+                    "cumulative_us": int(match.group(2)),
+                }
+            )
+    # ru_maxrss is in KiB on Linux.
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * 1024
+    return modules, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="app")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--json", metavar="FILE")
+    args = parser.parse_args()
+
+    modules, elapsed, peak = measure(args.module)
+    names = {m["name"] for m in modules}
+    target = next(m for m in modules if m["name"] == args.module)
+    packages = {}
+    for m in modules:
+        root = m["name"].split(".")[0]
+        packages[root] = packages.get(root, 0) + m["self_us"]
+    heavy = {
+        name: any(n == name or n.startswith(f"{name}.") for n in names)
+        for name in HEAVY
+    }
+
+    print(f"import {args.module}: {target['cumulative_us'] / 1000:.0f} ms")
+    print(f"process: {elapsed * 1000:.0f} ms, peak RSS {peak / 1024 / 1024:.0f} MiB")
+    print(f"{len(modules)} modules imported")
+    print("\nheavy dependencies:")
+    for name, loaded in heavy.items():
+        print(f"  {name:<16}{'loaded' if loaded else '-'}")
+    print(f"\n{'package':<40}{'ms':>8}")
+    for root, us in sorted(packages.items(), key=lambda p: -p[1])[: args.top]:
+        print(f"  {root:<38}{us / 1000:>8.1f}")
+    print(f"\n{'module (self time)':<40}{'ms':>8}")
+    for m in sorted(modules, key=lambda m: -m["self_us"])[: args.top]:
+        print(f"  {m['name']:<38}{m['self_us'] / 1000:>8.1f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(
+                {
+                    "module": args.module,
+                    "import_ms": target["cumulative_us"] / 1000,
+                    "process_ms": elapsed * 1000,
+                    "peak_rss_bytes": peak,
+                    "modules": len(modules),
+                    "heavy": heavy,
+                    "packages_ms": {k: v / 1000 for k, v in packages.items()},
+                },
+                f,
+                indent=2,
+                sort_keys=True,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+"""Replay browser sessions against gunicorn and report latency per interaction.
+
+    python scripts/loadtest.py [--config 2x4 4x4 4x1:sync] [--concurrency 16]
+                               [--duration 15] [--think 0] [--record FILE]
+                               [--sessions FILE] [--url URL]
+                               [--save [PATH]] [--compare [PATH]]
+
+Every callback of the app runs in the browser, so a session's load on the
+server is the HTTP requests the page makes. The interactions are: loading the
+page (page, layout, callback graph and the first preload), navigating (the
+/figures payloads navigation.js preloads around the current slide, once per
+session), opening the download modal and fetching a download, and the
+telemetry beacon. Theme switches and info panel clicks send nothing (one
+payload serves both themes) and are not timed.
+
+Sessions are synthesised as random walks over the deck, or replayed from a
+file written by --record. Each --config WORKERSxTHREADS[:CLASS] starts gunicorn
+with gunicorn.conf.py and telemetry on, on a local port (--url targets a
+running server instead, whose beacons fail unless it sets GDB_TELEMETRY=1),
+and CONCURRENCY client threads replay sessions back to back for DURATION
+seconds. The requests of one interaction are sent one after another, over a
+keep-alive connection per client. The report gives throughput and
+p50/p95/p99 latency per interaction type and configuration. --save writes the
+results as JSON; --compare prints the change against a saved run.
+"""
+
+import argparse
+import http.client
+import itertools
+import json
+import math
+import os
+import platform
+import random
+import sys
+import threading
+import time
+import urllib.parse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import downloads  # noqa: E402
+import slides  # noqa: E402
+from worker_memory import serve  # noqa: E402
+
+DEFAULT_OUTPUT = os.path.join(".benchmarks", "loadtest.json")
+# Slower (p95) or less throughput than this ratio against the baseline is flagged.
+REGRESSION_RATIO = 1.2
+# Radius of the preload in assets/navigation.js.
+PRELOAD_RADIUS = 1
+# Relative frequency of each user action after the page has loaded.
+ACTIONS = {"next": 55, "prev": 15, "theme": 10, "info": 10, "download": 10}
+HEADERS = {"Accept-Encoding": "gzip", "User-Agent": "gdb-loadtest"}
+
+
+def figure(index):
+    return ["GET", f"/figures/{index}.json?v={slides.payload_version()}"]
+
+
+def preload(index, cached):
+    requests = []
+    count = len(slides.SLIDE_NAMES)
+    for i in range(index - PRELOAD_RADIUS, index + PRELOAD_RADIUS + 1):
+        if 0 <= i < count and i not in cached:
+            cached.add(i)
+            requests.append(figure(i))
+    return requests
+
+
+def beacon(visited, theme):
+    entries = [
+        {"name": "first_graph", "value": 900.0},
+        {"name": "fcp", "value": 400.0},
+        {"name": "cls", "value": 0.01},
+    ]
+    entries += [
+        {"name": "render", "value": 250.0, "slide": index, "theme": theme}
+        for index in sorted(visited)
+    ]
+    return ["POST", "/telemetry", json.dumps({"metrics": entries})]
+
+
+def synthesise(rng, steps):
+    count = len(slides.SLIDE_NAMES)
+    targets = [
+        f"/downloads/{name}.{fmt}"
+        for name in downloads.SOURCES
+        for fmt in downloads.available_formats()
+    ]
+    # The layout carries slide 0; the initial navigate call preloads the rest.
+    index, theme, cached = 0, "light", {0}
+    load = [["GET", "/"], ["GET", "/_dash-layout"], ["GET", "/_dash-dependencies"]]
+    session = [{"type": "load", "requests": load + preload(index, cached)}]
+    visited = {index}
+    for action in rng.choices(list(ACTIONS), weights=ACTIONS.values(), k=steps):
+        if action in ("next", "prev"):
+            step = 1 if action == "next" else -1
+            if not 0 <= index + step < count:
+                step = -step
+            index += step
+            visited.add(index)
+            requests = preload(index, cached)
+            session.append({"type": "navigate", "requests": requests})
+        elif action == "theme":
+            theme = "dark" if theme == "light" else "light"
+            session.append({"type": "theme", "requests": []})
+        elif action == "download":
+            requests = [["GET", rng.choice(targets)]]
+            session.append({"type": "download", "requests": requests})
+        else:
+            session.append({"type": "info", "requests": []})
+    session.append({"type": "telemetry", "requests": [beacon(visited, theme)]})
+    return session
+
+
+class Client:
+    def __init__(self, base):
+        url = urllib.parse.urlsplit(base)
+        self.host, self.port = url.hostname, url.port or 80
+        self.connection = None
+
+    def send(self, method, path, body=None):
+        if self.connection is None:
+            self.connection = http.client.HTTPConnection(
+                self.host, self.port, timeout=60
+            )
+        headers = dict(HEADERS)
+        if body is not None:
+            headers["Content-Type"] = "text/plain"
+        try:
+            self.connection.request(method, path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            self.connection.close()
+            self.connection = None
+            return False
+        return response.status < 400
+
+
+def replay(base, sessions, concurrency, duration, think):
+    queue = itertools.cycle(sessions)
+    queue_lock = threading.Lock()
+    results = []
+    deadline = time.perf_counter() + duration
+
+    def worker():
+        client = Client(base)
+        timings = []
+        while time.perf_counter() < deadline:
+            with queue_lock:
+                session = next(queue)
+            for interaction in session:
+                if time.perf_counter() >= deadline:
+                    break
+                if not interaction["requests"]:
+                    continue
+                start = time.perf_counter()
+                ok = all([client.send(*request) for request in interaction["requests"]])
+                seconds = time.perf_counter() - start
+                timings.append(
+                    (interaction["type"], seconds, ok, len(interaction["requests"]))
+                )
+                if think:
+                    time.sleep(think)
+        results.append(timings)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return [t for timings in results for t in timings], time.perf_counter() - start
+
+
+def percentile(values, p):
+    return values[max(math.ceil(p / 100 * len(values)) - 1, 0)]
+
+
+def summarise(timings, elapsed):
+    groups = {}
+    for kind, seconds, ok, requests in timings:
+        groups.setdefault(kind, []).append((seconds, ok, requests))
+    groups["all"] = [entry for entries in groups.values() for entry in entries]
+    summary = {}
+    for kind, entries in groups.items():
+        seconds = sorted(s for s, _, _ in entries)
+        summary[kind] = {
+            "interactions": len(entries),
+            "requests": sum(r for _, _, r in entries),
+            "errors": sum(1 for _, ok, _ in entries if not ok),
+            "per_second": len(entries) / elapsed,
+            "requests_per_second": sum(r for _, _, r in entries) / elapsed,
+            **{f"p{p}_ms": percentile(seconds, p) * 1000 for p in (50, 95, 99)},
+        }
+    return summary
+
+
+def parse_config(text):
+    sizes, _, worker_class = text.partition(":")
+    workers, _, threads = sizes.partition("x")
+    return {
+        "GDB_WORKERS": workers,
+        "GDB_THREADS": threads or "1",
+        "GDB_WORKER_CLASS": worker_class or "gthread",
+        # The sessions end with a beacon.
+        "GDB_TELEMETRY": "1",
+    }
+
+
+def print_results(name, summary):
+    print(f"\n{name}")
+    print(
+        f"  {'interaction':<12}{'count':>8}{'/s':>9}{'req/s':>9}"
+        f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}"
+    )
+    for kind, values in summary.items():
+        print(
+            f"  {kind:<12}{values['interactions']:>8}{values['per_second']:>9.1f}"
+            f"{values['requests_per_second']:>9.1f}{values['p50_ms']:>9.1f}"
+            f"{values['p95_ms']:>9.1f}{values['p99_ms']:>9.1f}{values['errors']:>8}"
+        )
+
+
+def compare(results, baseline):
+    print(f"\nagainst baseline (flagged beyond x{REGRESSION_RATIO})")
+    for name, summary in results.items():
+        for kind, values in summary.items():
+            previous = baseline.get(name, {}).get(kind)
+            if not previous or not previous["per_second"] or not previous["p95_ms"]:
+                continue
+            throughput = values["per_second"] / previous["per_second"]
+            latency = values["p95_ms"] / previous["p95_ms"]
+            flag = (
+                " <-- regression"
+                if latency > REGRESSION_RATIO or throughput < 1 / REGRESSION_RATIO
+                else ""
+            )
+            print(
+                f"  {name:<14}{kind:<12}throughput x{throughput:.2f}  "
+                f"p95 x{latency:.2f}{flag}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--config", nargs="+", default=["2x4", "4x4"])
+    parser.add_argument("--url", help="load a running server instead")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=15)
+    parser.add_argument("--think", type=float, default=0, metavar="SECONDS")
+    parser.add_argument("--count", type=int, default=200, help="sessions")
+    parser.add_argument("--steps", type=int, default=20, help="actions per session")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sessions", metavar="FILE", help="replay these sessions")
+    parser.add_argument("--record", metavar="FILE", help="save the sessions")
+    parser.add_argument("--save", nargs="?", const=DEFAULT_OUTPUT, metavar="PATH")
+    parser.add_argument("--compare", nargs="?", const=DEFAULT_OUTPUT, metavar="PATH")
+    args = parser.parse_args()
+
+    if args.sessions:
+        with open(args.sessions) as f:
+            sessions = [json.loads(line) for line in f if line.strip()]
+    else:
+        rng = random.Random(args.seed)
+        sessions = [synthesise(rng, args.steps) for _ in range(args.count)]
+    if args.record:
+        with open(args.record, "w") as f:
+            f.writelines(json.dumps(session) + "\n" for session in sessions)
+
+    results = {}
+    configs = ["url"] if args.url else args.config
+    for name in configs:
+        if args.url:
+            timings, elapsed = replay(
+                args.url, sessions, args.concurrency, args.duration, args.think
+            )
+        else:
+            with serve(**parse_config(name)) as (base, _):
+                timings, elapsed = replay(
+                    base, sessions, args.concurrency, args.duration, args.think
+                )
+        results[name] = summarise(timings, elapsed)
+        print_results(name, results[name])
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f)["results"])
+    if args.save:
+        os.makedirs(os.path.dirname(args.save) or ".", exist_ok=True)
+        with open(args.save, "w") as f:
+            json.dump(
+                {
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "cpus": os.cpu_count(),
+                    "concurrency": args.concurrency,
+                    "duration": args.duration,
+                    "think": args.think,
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+        print(f"\nsaved {args.save}")
+
+
+if __name__ == "__main__":
+    main()
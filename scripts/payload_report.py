@@ -0,0 +1,42 @@
+"""Report the figure payload size of every slide before and after compaction.
+
+    python scripts/payload_report.py [--template plotly_dark]
+
+"raw" is the figure as Plotly serialises it, "compact" is the body GET /figures
+sends (slides.get_payload_json: the figure after payload.compact_figure, with
+its title and description); both are shown as JSON and gzip-compressed.
+"""
+
+import argparse
+import gzip
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import slides  # noqa: E402
+
+
+def sizes(data):
+    return len(data), len(gzip.compress(data, compresslevel=6))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--template", default="plotly", choices=slides.TEMPLATES)
+    args = parser.parse_args()
+
+    print(f"{'slide':<6}{'raw':>10}{'raw.gz':>10}{'compact':>10}{'compact.gz':>12}")
+    totals = [0, 0, 0, 0]
+    for index in range(len(slides.SLIDES)):
+        fig = slides.get_slide(index, args.template)[0]
+        raw = sizes(fig.to_json().encode())
+        compact = sizes(slides.get_payload_json(index))
+        row = raw + compact
+        totals = [total + value for total, value in zip(totals, row)]
+        print(f"{index:<6}{row[0]:>10}{row[1]:>10}{row[2]:>10}{row[3]:>12}")
+    print(f"{'total':<6}{totals[0]:>10}{totals[1]:>10}{totals[2]:>10}{totals[3]:>12}")
+
+
+if __name__ == "__main__":
+    main()
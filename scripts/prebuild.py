@@ -0,0 +1,70 @@
+"""Serialise every slide payload ahead of time, for workers to serve as is.
+
+    python scripts/prebuild.py [--output DIR]
+
+Writes <slide>.json for every slide (one payload serves both themes), plus a
+manifest with the payload version (dataset and code hashes), to OUTPUT
+(default: GDB_PREBUILT_DIR). While that version matches, the app reads slides from these
+files and never imports pandas or plotly to answer a request. Run it at build
+time, after the datasets are in place; stale files are simply ignored.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The app sets the assets URL (its path prefix) the payloads refer to.
+import app  # noqa: E402, F401
+import slides  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default=slides.PREBUILT_DIR)
+    args = parser.parse_args()
+    if not args.output:
+        parser.error("GDB_PREBUILT_DIR is empty, pass --output")
+
+    # Build from the data and code, not from an earlier prebuild.
+    slides.prebuilt_version = None
+    os.makedirs(args.output, exist_ok=True)
+    manifest = os.path.join(args.output, slides.PREBUILT_MANIFEST)
+    # Without a manifest no worker reads the files while they are replaced.
+    if os.path.exists(manifest):
+        os.remove(manifest)
+
+    start = time.perf_counter()
+    written, total = set(), 0
+    for index in range(len(slides.SLIDES)):
+        data = slides.get_payload_json(index)
+        path = slides.prebuilt_path(args.output, index)
+        with open(f"{path}.tmp", "wb") as f:
+            f.write(data)
+        os.replace(f"{path}.tmp", path)
+        written.add(os.path.basename(path))
+        total += len(data)
+        print(f"  {os.path.basename(path)} {len(data) / 1024:.0f} KiB")
+
+    for entry in os.listdir(args.output):
+        if entry.endswith(".json") and entry not in written:
+            os.remove(os.path.join(args.output, entry))
+    with open(f"{manifest}.tmp", "w") as f:
+        json.dump(
+            {"version": slides.payload_version(), "files": sorted(written)},
+            f,
+            indent=2,
+        )
+    os.replace(f"{manifest}.tmp", manifest)
+
+    print(
+        f"\nwrote {len(written)} payloads ({total / 1024:.0f} KiB) for version "
+        f"{slides.payload_version()} in {time.perf_counter() - start:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Export the whole deck as a static site that any file server or CDN can host.
+
+    python scripts/static_site.py [--output site]
+
+The page, every Dash/component bundle it loads, the assets, the slide payloads
+(figures/<slide>.json, for both themes) and the dataset downloads are
+written under OUTPUT with relative URLs, so the folder can be served from any
+path. Navigation, theme switching, the info panel and the download modal all
+run in the browser; the layout and callback graph Dash would normally request
+from the server are embedded in index.html.
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# A static host has no /telemetry route to send reports to.
+os.environ["GDB_TELEMETRY"] = "0"
+
+import app  # noqa: E402
+import downloads  # noqa: E402
+import slides  # noqa: E402
+
+URL_PREFIXES = ("/assets/", "/figures/", "/downloads/", "/_dash-component-suites/")
+LINKED = re.compile(r'(src|href)="/([^"?#]*)(\?[^"#]*)?"')
+
+# Answers the two requests Dash makes on startup from the embedded copies.
+FETCH_SHIM = """<script>
+(function () {
+    var embedded = {"_dash-layout": %(layout)s, "_dash-dependencies": %(dependencies)s};
+    var fetch = window.fetch.bind(window);
+    window.fetch = function (url, options) {
+        var name = String(url.url || url).split("?")[0].split("/").pop();
+        if (embedded.hasOwnProperty(name)) {
+            return Promise.resolve(new Response(JSON.stringify(embedded[name]), {
+                status: 200,
+                headers: {"Content-Type": "application/json"}
+            }));
+        }
+        return fetch(url, options);
+    };
+})();
+</script>"""
+
+
+def relative(value):
+    if isinstance(value, dict):
+        return {key: relative(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [relative(item) for item in value]
+    if isinstance(value, str) and value.startswith(URL_PREFIXES):
+        return "." + value
+    return value
+
+
+def save(output, path, data):
+    target = os.path.join(output, path)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with open(target, "wb") as f:
+        f.write(data)
+
+
+def fetch(client, path):
+    response = client.get(path, headers={"Accept-Encoding": "identity"})
+    if response.status_code != 200:
+        raise RuntimeError(f"GET {path} answered {response.status_code}")
+    return response.get_data()
+
+
+def embed(data):
+    # Safe inside a <script> element.
+    return json.dumps(data).replace("</", "<\\/")
+
+
+def export_page(client, output):
+    html = fetch(client, "/").decode()
+    for match in set(LINKED.finditer(html)):
+        save(output, match.group(2), fetch(client, "/" + match.group(2)))
+    html = LINKED.sub(
+        lambda m: f'{m.group(1)}="./{m.group(2)}{m.group(3) or ""}"', html
+    )
+
+    config = re.search(
+        r'(<script id="_dash-config" type="application/json">)(.*?)(</script>)',
+        html,
+        re.S,
+    )
+    settings = json.loads(config.group(2))
+    settings["url_base_pathname"] = settings["requests_pathname_prefix"] = "./"
+    html = html.replace(
+        config.group(0), config.group(1) + embed(settings) + config.group(3)
+    )
+
+    dependencies = json.loads(fetch(client, "/_dash-dependencies"))
+    server_side = [
+        d["output"] for d in dependencies if not d.get("clientside_function")
+    ]
+    if server_side:
+        raise RuntimeError(f"callbacks that need a server: {server_side}")
+    layout = relative(json.loads(fetch(client, "/_dash-layout")))
+    shim = FETCH_SHIM % {"layout": embed(layout), "dependencies": embed(dependencies)}
+    html = html.replace("<head>", "<head>\n" + shim, 1)
+    save(output, "index.html", html.encode())
+
+    # Chunks the component bundles load on demand (e.g. dcc's async-graph.js)
+    # are requested next to the bundle, without a fingerprint.
+    for package, paths in app.app.registered_paths.items():
+        for path in paths:
+            if not path.endswith(".map"):
+                suite = f"_dash-component-suites/{package}/{path}"
+                save(output, suite, fetch(client, "/" + suite))
+
+
+def export_figures(output):
+    # The map geometry is loaded relative to index.html, whatever the prefix
+    # the app was configured with.
+    slides.use_assets_url("./assets/")
+    for index in range(len(slides.SLIDES)):
+        data = relative(json.loads(slides.get_payload_json(index)))
+        data = json.dumps(data, separators=(",", ":")).encode()
+        save(output, f"figures/{index}.json", data)
+
+
+def export_downloads(client, output):
+    for name in downloads.SOURCES:
+        for fmt in downloads.available_formats():
+            path = f"downloads/{name}.{fmt}"
+            save(output, path, fetch(client, "/" + path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default="site")
+    args = parser.parse_args()
+
+    shutil.rmtree(args.output, ignore_errors=True)
+    client = app.server.test_client()
+    shutil.copytree(app.app.config.assets_folder, os.path.join(args.output, "assets"))
+    export_page(client, args.output)
+    export_figures(args.output)
+    export_downloads(client, args.output)
+
+    files = [os.path.join(d, f) for d, _, names in os.walk(args.output) for f in names]
+    size = sum(os.path.getsize(f) for f in files)
+    print(f"wrote {len(files)} files ({size / 1024 / 1024:.1f} MiB) to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
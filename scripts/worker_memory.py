@@ -0,0 +1,152 @@
+"""Measure the memory of each gunicorn worker, with and without preloading.
+
+    python scripts/worker_memory.py [--workers 4] [--requests 200]
+                                    [--mode preload no-preload]
+
+For each mode, starts gunicorn with gunicorn.conf.py on a free local port,
+requests the page and every slide until each worker has served traffic, then
+reads /proc/<pid>/smaps_rollup of the master and the workers (Linux only). RSS counts shared pages in full in every process; PSS splits
+them between the processes that share them; USS is the memory that only that
+process holds, i.e. what one more worker costs.
+"""
+
+import argparse
+import contextlib
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import slides  # noqa: E402
+
+FIELDS = ["Rss", "Pss", "Private_Clean", "Private_Dirty"]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def smaps(pid):
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            name, _, rest = line.partition(":")
+            if name in FIELDS:
+                values[name] = int(rest.split()[0]) * 1024
+    values["Uss"] = values["Private_Clean"] + values["Private_Dirty"]
+    return values
+
+
+def children(pid):
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(child) for child in f.read().split()]
+
+
+def get(url):
+    with urllib.request.urlopen(url, timeout=30) as response:
+        return response.read()
+
+
+def wait_ready(base, process, timeout=300):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            sys.exit(f"gunicorn exited with {process.returncode}")
+        try:
+            get(f"{base}/healthz/ready")
+            return
+        except OSError:
+            time.sleep(0.5)
+    sys.exit("gunicorn did not become ready")
+
+
+@contextlib.contextmanager
+def serve(**settings):
+    # gunicorn with gunicorn.conf.py on a free local port, until it is ready;
+    # settings are GDB_* environment variables (e.g. GDB_WORKERS="4").
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py"],
+        cwd=BASE_DIR,
+        env=dict(os.environ, GDB_BIND=f"127.0.0.1:{port}", **settings),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        base = f"http://127.0.0.1:{port}"
+        wait_ready(base, process)
+        # Every worker must be up before it can be measured.
+        while len(children(process.pid)) < int(settings.get("GDB_WORKERS", 1)):
+            time.sleep(0.2)
+        yield base, process
+    finally:
+        process.send_signal(signal.SIGTERM)
+        process.wait(timeout=60)
+
+
+def measure(mode, workers, requests):
+    start = time.perf_counter()
+    with serve(
+        GDB_WORKERS=str(workers), GDB_PRELOAD="1" if mode == "preload" else "0"
+    ) as (base, process):
+        ready = time.perf_counter() - start
+        paths = ["/", "/_dash-layout"] + [
+            f"/figures/{index}.json" for index in range(len(slides.SLIDES))
+        ]
+        for i in range(requests):
+            get(base + paths[i % len(paths)])
+        time.sleep(1)
+        master = smaps(process.pid)
+        worker_stats = [smaps(pid) for pid in children(process.pid)]
+    return ready, master, worker_stats
+
+
+def mib(value):
+    return f"{value / 1024 / 1024:.1f}"
+
+
+def row(mode, name, stats):
+    return (
+        f"{mode:<12}{name:<10}"
+        f"{mib(stats['Rss']):>8}{mib(stats['Pss']):>8}{mib(stats['Uss']):>8}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument(
+        "--mode",
+        nargs="+",
+        default=["preload", "no-preload"],
+        choices=["preload", "no-preload"],
+    )
+    args = parser.parse_args()
+
+    print(f"{'mode':<12}{'process':<10}{'RSS':>8}{'PSS':>8}{'USS':>8}  (MiB)")
+    for mode in args.mode:
+        ready, master, workers = measure(mode, args.workers, args.requests)
+        average = {
+            key: sum(w[key] for w in workers) / len(workers)
+            for key in ("Rss", "Pss", "Uss")
+        }
+        total = master["Pss"] + sum(w["Pss"] for w in workers)
+        print(row(mode, "master", master))
+        print(row("", "worker", average))
+        print(
+            f"{'':<12}{len(workers)} workers ready in {ready:.1f}s, "
+            f"{mib(total)} MiB PSS in total"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+import functools
+import glob
+import importlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import datasets
+import figure_cache
+import metrics
+import payload
+import profiling
+
+TEMPLATES = ["plotly", "plotly_dark"]
+# Payloads leave the template out (the browser applies the current theme's),
+# so one build per slide, from this template, serves both themes.
+PAYLOAD_TEMPLATE = TEMPLATES[0]
+
+SLIDE_CACHE_SIZE = int(os.environ.get("GDB_SLIDE_CACHE_SIZE", "32"))
+
+# Set once every slide payload has been built (or immediately when warm-up is
+# disabled), see warm_up().
+ready = threading.Event()
+
+
+# The frames, the viz modules and with them pandas and plotly are loaded on
+# the first slide build (see frames() and viz()); the version only needs the
+# source hashes.
+DATASET_VERSION = datasets.version(datasets.source_hashes())
+_frames = None
+_frames_lock = threading.Lock()
+
+# Payloads shared across workers and restarts are also keyed on the code that
+# builds them and on the payload settings, so a deploy never serves stale ones.
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CODE_HASHES = {
+    **{
+        path: datasets.file_hash(path)
+        for path in [
+            os.path.join(BASE_DIR, "slides.py"),
+            os.path.join(BASE_DIR, "payload.py"),
+            *glob.glob(os.path.join(BASE_DIR, "viz", "*.py")),
+        ]
+    },
+    "payload": f"{payload.DECIMALS}-{payload.BINARY}",
+}
+# Where the browser loads assets from (the map geometry is referenced by URL),
+# including any path prefix the app runs under; see use_assets_url().
+ASSETS_URL = "/assets/"
+CODE_VERSION = datasets.version({**CODE_HASHES, "assets": ASSETS_URL})
+shared_cache = figure_cache.default()
+
+# Payloads serialised at build time by scripts/prebuild.py. While they match
+# the current data and code, slides are read from there instead of built.
+PREBUILT_DIR = os.environ.get(
+    "GDB_PREBUILT_DIR", os.path.join(BASE_DIR, "Datasets", ".cache", "prebuilt")
+)
+PREBUILT_MANIFEST = "manifest.json"
+
+# One builder per slide, in presentation order. Builders are only called on a
+# cache miss, so showing a slide never pays for the other four. The frames are
+# read-only and shared, so they are passed without copying.
+SLIDES = [
+    lambda template: viz("choroplet_score").graph(
+        frames()["map"], template=template, assets_url=ASSETS_URL
+    ),
+    lambda template: viz("heat_area_action").graph(
+        frames()["areas"], template=template
+    ),
+    lambda template: viz("internet_access").graph(frames()["areas"], template=template),
+    lambda template: viz("cpi_bar").graph(frames()["areas"], template=template),
+    lambda template: viz("summary").graph(template=template),
+]
+SLIDE_NAMES = [
+    "choroplet_score",
+    "heat_area_action",
+    "internet_access",
+    "cpi_bar",
+    "summary",
+]
+
+
+def viz(name):
+    return importlib.import_module(f"viz.{name}")
+
+
+def frames():
+    global _frames
+    with _frames_lock:
+        if _frames is None:
+            _frames = datasets.load_all()[0]
+    return _frames
+
+
+def load():
+    # Everything a slide build needs, up front instead of on first use.
+    for name in SLIDE_NAMES:
+        viz(name)
+    frames()
+
+
+def _read_prebuilt_version():
+    try:
+        with open(os.path.join(PREBUILT_DIR, PREBUILT_MANIFEST)) as f:
+            return json.load(f).get("version")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+prebuilt_version = _read_prebuilt_version() if PREBUILT_DIR else None
+
+
+def prebuilt_path(directory, index):
+    return os.path.join(directory, f"{SLIDE_NAMES[index]}.json")
+
+
+@functools.lru_cache(maxsize=SLIDE_CACHE_SIZE)
+def _build_slide(index, template, version):
+    metrics.inc(metrics.cache_misses, "figure")
+    with metrics.timed(metrics.builder_seconds, SLIDE_NAMES[index]):
+        with profiling.profiled(f"{SLIDE_NAMES[index]}-{template}"):
+            return SLIDES[index](template)
+
+
+def use_datasets(map_frame, areas_frame, version, shared=True):
+    # Point every slide at other data (synthetic benchmark data, another
+    # edition); cached figures are keyed by version so they never mix.
+    # shared=False also stops using the host-wide and prebuilt payloads.
+    global _frames, DATASET_VERSION, shared_cache, prebuilt_version
+    with _frames_lock:
+        _frames = {"map": map_frame, "areas": areas_frame}
+    DATASET_VERSION = version
+    if not shared:
+        shared_cache = prebuilt_version = None
+    _build_slide.cache_clear()
+    _build_payload_json.cache_clear()
+    _build_payload.cache_clear()
+
+
+def use_assets_url(url):
+    # Set by the app from app.get_asset_url(""), so the payloads point at the
+    # assets under the app's path prefix.
+    global ASSETS_URL, CODE_VERSION
+    if url == ASSETS_URL:
+        return
+    ASSETS_URL = url
+    CODE_VERSION = datasets.version({**CODE_HASHES, "assets": url})
+    _build_slide.cache_clear()
+    _build_payload_json.cache_clear()
+    _build_payload.cache_clear()
+
+
+def get_slide(index, template):
+    metrics.inc(metrics.cache_lookups, "figure")
+    return _build_slide(index, template, DATASET_VERSION)
+
+
+def _compact_slide(index, version):
+    metrics.inc(metrics.cache_lookups, "figure")
+    fig, title, description = _build_slide(index, PAYLOAD_TEMPLATE, version)
+    with metrics.timed(metrics.payload_seconds, SLIDE_NAMES[index]):
+        figure = payload.compact_figure(fig)
+    return {
+        "figure": figure,
+        "title": title,
+        "description": description,
+    }
+
+
+def _shared_key(index, version):
+    return f"{SLIDE_NAMES[index]}-{version}-{CODE_VERSION}"
+
+
+@functools.lru_cache(maxsize=SLIDE_CACHE_SIZE)
+def _build_payload_json(index, version):
+    metrics.inc(metrics.cache_misses, "payload")
+    if prebuilt_version == f"{version}-{CODE_VERSION}":
+        metrics.inc(metrics.cache_lookups, "prebuilt")
+        try:
+            with open(prebuilt_path(PREBUILT_DIR, index), "rb") as f:
+                return f.read()
+        except OSError:
+            metrics.inc(metrics.cache_misses, "prebuilt")
+
+    def build():
+        from plotly.utils import PlotlyJSONEncoder
+
+        return json.dumps(
+            _compact_slide(index, version),
+            cls=PlotlyJSONEncoder,
+            separators=(",", ":"),
+        ).encode()
+
+    if shared_cache is None:
+        return build()
+    metrics.inc(metrics.cache_lookups, "shared")
+    try:
+        data, built = figure_cache.get_or_build(
+            shared_cache, _shared_key(index, version), build
+        )
+    except OSError:
+        metrics.inc(metrics.cache_misses, "shared")
+        return build()
+    if built:
+        metrics.inc(metrics.cache_misses, "shared")
+    return data
+
+
+@functools.lru_cache(maxsize=SLIDE_CACHE_SIZE)
+def _build_payload(index, version):
+    return json.loads(_build_payload_json(index, version))
+
+
+# What the browser receives for a slide, whatever the theme: the compacted
+# figure (no template, rounded and typed numeric arrays) with its title and
+# description.
+def get_payload(index):
+    metrics.inc(metrics.cache_lookups, "payload")
+    return _build_payload(index, DATASET_VERSION)
+
+
+# The same payload serialized, as served by GET /figures/<slide>.json.
+def get_payload_json(index):
+    metrics.inc(metrics.cache_lookups, "payload")
+    return _build_payload_json(index, DATASET_VERSION)
+
+
+def payload_version():
+    return f"{DATASET_VERSION}-{CODE_VERSION}"
+
+
+def payload_etag(index):
+    return f"{SLIDE_NAMES[index]}-{payload_version()}"
+
+
+def get_plots(template):
+    return [get_slide(index, template) for index in range(len(SLIDES))]
+
+
+def release_figures():
+    # Once their payloads exist, built figures are only needed by get_slide().
+    _build_slide.cache_clear()
+
+
+def warm_up(threads=0):
+    indexes = range(len(SLIDES))
+    if threads:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(get_payload, indexes))
+    else:
+        for index in indexes:
+            get_payload(index)
+    ready.set()
+
+
+def start_warm_up(threads=0, background=False):
+    if not background:
+        warm_up(threads)
+        return None
+    thread = threading.Thread(
+        target=warm_up, args=(threads,), name="slide-warm-up", daemon=True
+    )
+    thread.start()
+    return thread
@@ -0,0 +1,73 @@
+import json
+import math
+import os
+
+import metrics
+import slides
+
+# Off by default: the endpoint takes unauthenticated posts. Reports are
+# aggregated into the /metrics histograms, so they need metrics.
+ENABLED = os.environ.get("GDB_TELEMETRY", "0") == "1" and metrics.ENABLED
+# assets/telemetry.js is left out of the page when telemetry is off.
+ASSETS_IGNORE = r"^telemetry\.js$"
+MAX_BODY = 64 * 1024
+MAX_MILLISECONDS = 10 * 60 * 1000
+THEMES = {"light", "dark"}
+# Reported in milliseconds since navigation start (or as a duration).
+TIMINGS = {"ttfb", "fcp", "lcp", "inp", "first_graph", "fullscreen_bind", "long_tasks"}
+
+
+def record(entry):
+    if not isinstance(entry, dict):
+        return False
+    name, value = entry.get("name"), entry.get("value")
+    if (
+        isinstance(value, bool)
+        or not isinstance(value, (int, float))
+        or not math.isfinite(value)
+        or value < 0
+    ):
+        return False
+    if name == "cls":
+        metrics.observe(metrics.client_layout_shift, name, min(value, 100.0))
+        return True
+    if value > MAX_MILLISECONDS:
+        return False
+    if name in TIMINGS:
+        metrics.observe(metrics.client_timing_seconds, name, value / 1000)
+        return True
+    if name == "render":
+        slide, theme = entry.get("slide"), entry.get("theme")
+        if (
+            isinstance(slide, int)
+            and 0 <= slide < len(slides.SLIDE_NAMES)
+            and theme in THEMES
+        ):
+            label = f"{slides.SLIDE_NAMES[slide]}/{theme}"
+            metrics.observe(metrics.client_render_seconds, label, value / 1000)
+            return True
+    return False
+
+
+def register(server):
+    from flask import Response, abort, request
+
+    @server.route("/telemetry", methods=["POST"])
+    def collect_telemetry():
+        # sendBeacon posts a text/plain body, so the content type is not checked.
+        if (request.content_length or 0) > MAX_BODY:
+            abort(413)
+        body = request.stream.read(MAX_BODY + 1)
+        if len(body) > MAX_BODY:
+            abort(413)
+        try:
+            batch = json.loads(body)["metrics"]
+        except (ValueError, TypeError, KeyError):
+            abort(400)
+        if not isinstance(batch, list):
+            abort(400)
+        for entry in batch[:100]:
+            record(entry)
+        return Response(status=204)
+
+    return collect_telemetry
@@ -1,68 +1,108 @@
-import pandas as pd
 import plotly.graph_objects as go
 
+from viz import geometry
 
-def graph(df, template="plotly_dark"):
+INDICATORS = {
+    "Overall Score": "overall_score",
+    "Company Information": "Company Information",
+    "Critical Competencies": "Critical Competencies",
+    "Equitable Access": "Equitable Access",
+    "Governance Foundation": "Governance Foundation",
+    "Land Management": "Land Management",
+    "Political Integrity": "Political Integrity",
+    "Public Finance": "Public Finance",
+    "Public Procurement": "Public Procurement",
+}
+
+
+def graph(df, template="plotly_dark", assets_url="/assets/"):
     title = "Regional Overview: The State of Data in Latin America and the Caribbean"
     description = "A snapshot of national scores across key data domains, highlighting current conditions and regional contrasts."
 
-    columns = [
-        "Overall Score",
-        "Company Information",
-        "Critical Competencies",
-        "Equitable Access",
-        "Governance Foundation",
-        "Land Management",
-        "Political Integrity",
-        "Public Finance",
-        "Public Procurement",
-    ]
-
-    column_mapping = {
-        "Overall Score": "overall_score",
-        "Company Information": "Company Information",
-        "Critical Competencies": "Critical Competencies",
-        "Equitable Access": "Equitable Access",
-        "Governance Foundation": "Governance Foundation",
-        "Land Management": "Land Management",
-        "Political Integrity": "Political Integrity",
-        "Public Finance": "Public Finance",
-        "Public Procurement": "Public Procurement",
+    # Any other numeric indicator in the extract is offered after the
+    # known ones, under its column name.
+    indicators = {
+        label: column for label, column in INDICATORS.items() if column in df.columns
     }
+    for column in df.columns:
+        if column not in indicators.values() and column not in ("iso3", "country"):
+            indicators[column] = column
+
+    # Country shapes come from the LAC bundle under assets/geo (see
+    # scripts/build_geometry.py), fetched once by the browser and cached.
+    # plotly.js still asks for its world topojson; the topojsonURL config
+    # points it at the empty stand-in next to them, so nothing needs a CDN.
+    geojson = geometry.asset_url(assets_url=assets_url)
+    unscored = [iso3 for iso3 in geometry.LAC_ISO3 if iso3 not in set(df["iso3"])]
+    shapes = geometry.features()
+    islands = [
+        position
+        for position, iso3 in enumerate(df["iso3"])
+        if iso3 not in shapes and iso3 in geometry.ISLAND_CENTROIDS
+    ]
+    centroids = [geometry.ISLAND_CENTROIDS[df["iso3"].iloc[i]] for i in islands]
 
-    traces = []
-    for col_name in columns:
-        col_data = column_mapping[col_name]
-        traces.append(
+    first = next(iter(indicators.values()))
+    fig = go.Figure(
+        [
             go.Choropleth(
+                geojson=geojson,
+                featureidkey="properties.iso3",
                 locations=df["iso3"],
-                z=df[col_data],
+                z=df[first],
                 text=df["country"],
                 coloraxis="coloraxis",
                 marker_line_color="white",
                 marker_line_width=0.5,
-                visible=(col_name == "Overall Score"),
                 zmin=0,
                 zmax=100,
                 hovertemplate="<b>%{text}</b><br>Score: %{z:.2f}%<extra></extra>",
-            )
-        )
+            ),
+            go.Choropleth(
+                geojson=geojson,
+                featureidkey="properties.iso3",
+                locations=unscored,
+                z=[0] * len(unscored),
+                colorscale=[[0, "rgba(128,128,128,0.3)"], [1, "rgba(128,128,128,0.3)"]],
+                showscale=False,
+                marker_line_color="white",
+                marker_line_width=0.5,
+                hoverinfo="skip",
+            ),
+            go.Scattergeo(
+                lon=[lon for lon, _ in centroids],
+                lat=[lat for _, lat in centroids],
+                text=df["country"].iloc[islands].to_numpy(),
+                marker=dict(
+                    color=df[first].iloc[islands].to_numpy(),
+                    coloraxis="coloraxis",
+                    size=9,
+                    line=dict(color="white", width=0.5),
+                ),
+                mode="markers",
+                hovertemplate="<b>%{text}</b><br>Score: %{marker.color:.2f}%<extra></extra>",
+                showlegend=False,
+            ),
+        ]
+    )
 
-    buttons = []
-    for i, col_name in enumerate(columns):
-        visible = [False] * len(columns)
-        visible[i] = True
-        buttons.append(
-            dict(
-                label=col_name,
-                method="update",
-                args=[
-                    {"visible": visible},
-                ],
-            )
+    # Each option only restyles z on the scored trace (and the island marker
+    # colours), so locations, text and styling are sent once whatever the
+    # number of indicators. null leaves an attribute the trace does not have.
+    buttons = [
+        dict(
+            label=label,
+            method="restyle",
+            args=[
+                {
+                    "z": [df[column].to_numpy(), None],
+                    "marker.color": [None, df[column].iloc[islands].to_numpy()],
+                },
+                [0, 2],
+            ],
         )
-
-    fig = go.Figure(data=traces)
+        for label, column in indicators.items()
+    ]
 
     fig.update_layout(
         template=template,
@@ -71,14 +111,12 @@ def graph(df, template="plotly_dark"):
         height=500,
         margin=dict(t=0, b=0, r=0, l=0),
         geo=dict(
-            scope="world",
+            visible=False,
             projection_type="mercator",
-            showlakes=False,
             bgcolor="rgba(0,0,0,0)",
             lonaxis=dict(range=[-140, -30]),
             lataxis=dict(range=[-60, 35]),
             showframe=False,
-            showcoastlines=False,
         ),
         updatemenus=[
             dict(
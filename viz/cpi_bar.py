@@ -1,27 +1,31 @@
 import plotly.graph_objects as go
-import pandas as pd
+
+import datasets
+
+KEY_COLUMNS = [
+    "Company Register",
+    "Beneficial Ownership",
+    "Interest and asset declarations",
+    "Lobbying",
+    "Political Finance",
+    "cpi",
+    "country",
+]
+
+
+def normalize(df):
+    df = df[[col for col in KEY_COLUMNS if col in df.columns]]
+    cols_to_stack = [col for col in df.columns if col not in ["country", "cpi"]]
+    df = df.assign(**{col: df[col] / 5 for col in cols_to_stack})
+    return df.sort_values("cpi", ascending=False)
 
 
 def graph(df, template):
     title = "Corruption Perception and Institutional Capacity for Strategic Data Transparency and Control"
     description = "This chart contrasts perception of corruption (CPI) with institutional development focused on the publication, management, and control of strategic data: company registers, political transparency, and financial oversight."
 
-    key_columns = [
-        "Company Register",
-        "Beneficial Ownership",
-        "Interest and asset declarations",
-        "Lobbying",
-        "Political Finance",
-        "cpi",
-        "country",
-    ]
-    df = df[[col for col in key_columns if col in df.columns]].copy()
-    cols_to_stack = [col for col in df.columns if col not in ["country", "cpi"]]
-    df[cols_to_stack] = df[cols_to_stack].apply(pd.to_numeric, errors="coerce")
-    df["cpi"] = pd.to_numeric(df["cpi"], errors="coerce")
-    for col in cols_to_stack:
-        df[col] = df[col] / 5
-    df_sorted = df.sort_values("cpi", ascending=False)
+    df_sorted = datasets.derived(df, "cpi_bar", normalize)
+    cols_to_stack = [col for col in df_sorted.columns if col not in ["country", "cpi"]]
     countries = df_sorted["country"].tolist()
     cpi_values = df_sorted["cpi"].tolist()
     base_rgba = "176, 196, 222"
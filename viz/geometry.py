@@ -0,0 +1,124 @@
+import functools
+import json
+import os
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Countries and territories of Latin America and the Caribbean drawn on the
+# map, scored or not. The bundled geometry only contains these features.
+LAC_ISO3 = [
+    "ABW",
+    "ARG",
+    "ATG",
+    "BHS",
+    "BLZ",
+    "BOL",
+    "BRA",
+    "BRB",
+    "CHL",
+    "COL",
+    "CRI",
+    "CUB",
+    "CUW",
+    "CYM",
+    "DMA",
+    "DOM",
+    "ECU",
+    "FLK",
+    "GRD",
+    "GTM",
+    "GUY",
+    "HND",
+    "HTI",
+    "JAM",
+    "KNA",
+    "LCA",
+    "MEX",
+    "NIC",
+    "PAN",
+    "PER",
+    "PRI",
+    "PRY",
+    "SLV",
+    "SUR",
+    "SXM",
+    "TCA",
+    "TTO",
+    "URY",
+    "VCT",
+    "VEN",
+    "VGB",
+    "VIR",
+]
+
+# Centroids (lon, lat) of the islands in LAC_ISO3 that are too small for the
+# 1:110m Natural Earth geometry. A scored island without a shape is drawn as
+# a marker at its centroid instead of disappearing from the map.
+ISLAND_CENTROIDS = {
+    "ABW": (-69.97, 12.52),
+    "ATG": (-61.80, 17.08),
+    "BRB": (-59.55, 13.17),
+    "CUW": (-68.95, 12.17),
+    "CYM": (-81.25, 19.31),
+    "DMA": (-61.36, 15.42),
+    "GRD": (-61.68, 12.12),
+    "KNA": (-62.75, 17.30),
+    "LCA": (-60.98, 13.91),
+    "SXM": (-63.06, 18.04),
+    "TCA": (-71.80, 21.77),
+    "VCT": (-61.20, 13.25),
+    "VGB": (-64.62, 18.43),
+    "VIR": (-64.80, 18.34),
+}
+
+# Douglas-Peucker tolerance in degrees for each bundled simplification level.
+LEVELS = {"high": 0.0, "medium": 0.1, "low": 0.3}
+
+LEVEL = os.environ.get("GDB_MAP_GEOMETRY", "medium")
+
+
+def asset_path(level=LEVEL):
+    return os.path.join(BASE_DIR, "assets", "geo", f"lac-{level}.json")
+
+
+def asset_url(level=LEVEL, assets_url="/assets/"):
+    # assets_url is the app's (app.get_asset_url("")), prefix included.
+    return f"{assets_url}geo/lac-{level}.json"
+
+
+# plotly.js loads its world topojson for any geo subplot whose first trace has
+# a locationmode, and a GeoJSON choropleth always has one ("geojson-id"). The
+# map draws no base layers, so an empty topology under this name, served from
+# assets/geo/ through the topojsonURL config, stands in for the CDN file.
+TOPOJSON_NAME = "world_110m"
+TOPOJSON_LAYERS = [
+    "coastlines",
+    "countries",
+    "lakes",
+    "land",
+    "ocean",
+    "rivers",
+    "subunits",
+]
+
+
+def topojson_path():
+    return os.path.join(BASE_DIR, "assets", "geo", f"{TOPOJSON_NAME}.json")
+
+
+def topojson_url(assets_url="/assets/"):
+    # plotly.js appends "<name>.json" to this base.
+    return f"{assets_url}geo/"
+
+
+def topojson():
+    with open(topojson_path()) as f:
+        return json.load(f)
+
+
+@functools.lru_cache(maxsize=None)
+def features(level=LEVEL):
+    with open(asset_path(level)) as f:
+        return frozenset(
+            feature["properties"]["iso3"] for feature in json.load(f)["features"]
+        )
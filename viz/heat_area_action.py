@@ -1,62 +1,94 @@
-import plotly.express as px
-import pandas as pd
+import os
+
 import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+# Above these sizes rows (countries) and columns (action areas) are averaged
+# into contiguous buckets on the server, so the figure stays bounded no matter
+# how large the extract is.
+MAX_ROWS = int(os.environ.get("GDB_HEATMAP_MAX_ROWS", "60"))
+MAX_COLS = int(os.environ.get("GDB_HEATMAP_MAX_COLS", "60"))
+
+EXCLUDE_COLUMNS = ["cpi", "internet_access", "country"]
+
+# Action areas are grouped by their regional mean score (0-100).
+DEVELOPMENT_GROUPS = [
+    ("LAC - High Development", 60),
+    ("LAC - Medium Development", 40),
+    ("LAC - Low Development", -np.inf),
+]
+
+
+def scale(matrix):
+    return (matrix - np.min(matrix)) / (np.max(matrix) - np.min(matrix) + 1e-9)
+
+
+# Raw scores next to the 0-1 values the heatmap colours them by.
+def normalize(df):
+    data_cols = [col for col in df.columns if col not in EXCLUDE_COLUMNS]
+    scaled = scale(df[data_cols].to_numpy(dtype=float))
+    return pd.DataFrame(
+        {
+            "country": df["country"].to_numpy(),
+            **{col: df[col].to_numpy() for col in data_cols},
+            **{f"{col} (normalized)": scaled[:, i] for i, col in enumerate(data_cols)},
+        }
+    )
+
+
+def aggregate(labels, matrix, limit, axis):
+    if len(labels) <= limit:
+        return list(labels), matrix
+    chunks = np.array_split(np.arange(len(labels)), limit)
+    starts = np.array([chunk[0] for chunk in chunks])
+    sizes = np.array([len(chunk) for chunk in chunks])
+    shape = [1, 1]
+    shape[axis] = len(chunks)
+    matrix = np.add.reduceat(matrix, starts, axis=axis) / sizes.reshape(shape)
+    labels = [
+        (
+            f"{labels[chunk[0]]} … {labels[chunk[-1]]} ({len(chunk)})"
+            if len(chunk) > 1
+            else labels[chunk[0]]
+        )
+        for chunk in chunks
+    ]
+    return labels, matrix
+
+
+def development_groups(column_scores):
+    thresholds = np.array([threshold for _, threshold in DEVELOPMENT_GROUPS])
+    tiers = np.argmax(column_scores[:, None] >= thresholds[None, :], axis=1)
+    # Columns are sorted by score, so each tier is one contiguous run.
+    starts = np.flatnonzero(np.diff(tiers, prepend=-1))
+    ends = np.append(starts[1:], len(tiers)) - 1
+    return [
+        (DEVELOPMENT_GROUPS[tiers[start]][0], start, end)
+        for start, end in zip(starts, ends)
+    ]
 
 
-def add_separators_and_annotations(fig, df, ordered_cols, norm_matrix):
-    total_columns = len(ordered_cols)
-    num_rows = len(df["country"])
-    lines_positions = [2.5, 9.5]
-    for pos_line in lines_positions:
+def add_separators_and_annotations(fig, groups, num_rows):
+    for _, start, _ in groups[1:]:
         fig.add_shape(
             type="line",
-            x0=pos_line,
-            x1=pos_line,
+            x0=start - 0.5,
+            x1=start - 0.5,
             y0=-1.8,
-            y1=num_rows + 0.5,
+            y1=num_rows - 0.5,
             line=dict(color="grey", width=2),
             xref="x",
             yref="y",
         )
 
-    fig.add_annotation(
-        x=1,
-        y=-2.5,
-        text="LAC - High Development",
-        showarrow=False,
-        font=dict(size=12, color="grey"),
-        xref="x",
-        yref="y",
-    )
-
-    fig.add_annotation(
-        x=6.25,
-        y=-2.5,
-        text="LAC - Medium Development",
-        showarrow=False,
-        font=dict(size=12, color="grey"),
-        xref="x",
-        yref="y",
-    )
-
-    fig.add_annotation(
-        x=(10 + total_columns) / 2,
-        y=-2.5,
-        text="LAC - Low Development",
-        showarrow=False,
-        font=dict(size=12, color="grey"),
-        xref="x",
-        yref="y",
-    )
-
-    column_means = norm_matrix.mean(axis=0)
-    for idx, mean_value in enumerate(column_means):
+    for label, start, end in groups:
         fig.add_annotation(
-            x=idx,
-            y=-1.3,
-            text=f"{mean_value:.2f}",
+            x=(start + end) / 2,
+            y=-2.5,
+            text=label,
             showarrow=False,
-            font=dict(size=10, color="grey"),
+            font=dict(size=12, color="grey"),
             xref="x",
             yref="y",
         )
@@ -65,31 +97,49 @@ def add_separators_and_annotations(fig, df, ordered_cols, norm_matrix):
 def graph(df, template):
     title = "Action Areas by Country: Uneven Efforts in Building Capacities"
     description = "Shows the status of each action area by country, revealing priorities and gaps in capacity development across the region."
-    exclude_cols = ["cpi", "internet_access", "country"]
-    data_cols = [col for col in df.columns if col not in exclude_cols]
+    data_cols = [col for col in df.columns if col not in EXCLUDE_COLUMNS]
 
-    ordered_cols = df[data_cols].sum().sort_values(ascending=False).index.tolist()
+    data_matrix = df[data_cols].to_numpy(dtype=float)
+    countries = df["country"].to_numpy()
 
-    data_matrix = df[ordered_cols].to_numpy()
-    norm_matrix = (data_matrix - np.min(data_matrix)) / (
-        np.max(data_matrix) - np.min(data_matrix) + 1e-9
-    )
+    column_order = np.argsort(-data_matrix.sum(axis=0), kind="stable")
+    ordered_cols = [data_cols[idx] for idx in column_order]
+    data_matrix = data_matrix[:, column_order]
 
-    hovertext = []
-    for i, country in enumerate(df["country"]):
-        row = []
-        for j, col in enumerate(ordered_cols):
-            val = data_matrix[i][j]
-            row.append(f"Country: {country}<br>{col}: {val:.2f}")
-        hovertext.append(row)
-
-    fig = px.imshow(
-        norm_matrix,
-        labels=dict(x="Action area", y="Country", color="Score"),
-        x=ordered_cols,
-        y=df["country"],
-        aspect="auto",
-        color_continuous_scale="Blues",
+    if len(countries) > MAX_ROWS:
+        row_order = np.argsort(-data_matrix.mean(axis=1), kind="stable")
+        countries, data_matrix = aggregate(
+            countries[row_order], data_matrix[row_order], MAX_ROWS, axis=0
+        )
+    ordered_cols, data_matrix = aggregate(ordered_cols, data_matrix, MAX_COLS, axis=1)
+
+    norm_matrix = scale(data_matrix)
+    num_rows = len(countries)
+    groups = development_groups(data_matrix.mean(axis=0))
+
+    fig = go.Figure(
+        [
+            go.Heatmap(
+                z=norm_matrix,
+                x=ordered_cols,
+                y=countries,
+                customdata=data_matrix,
+                coloraxis="coloraxis",
+                hovertemplate="Country: %{y}<br>%{x}: %{customdata:.2f}<extra></extra>",
+            ),
+            # Column means as one text trace on an overlaid numeric axis,
+            # instead of one annotation per column.
+            go.Scatter(
+                x=ordered_cols,
+                y=np.full(len(ordered_cols), -1.3),
+                text=np.char.mod("%.2f", norm_matrix.mean(axis=0)),
+                mode="text",
+                textfont=dict(size=10, color="grey"),
+                yaxis="y2",
+                hoverinfo="skip",
+                showlegend=False,
+            ),
+        ]
     )
 
     fig.update_layout(
@@ -98,13 +148,25 @@ def graph(df, template):
         margin=dict(l=40, r=40, t=5, b=10),
         plot_bgcolor="rgba(0,0,0,0)",
         paper_bgcolor="rgba(0,0,0,0)",
-        coloraxis_colorbar=dict(title="Score", thickness=10),
+        coloraxis=dict(
+            colorscale="Blues",
+            colorbar=dict(title="Score", thickness=10),
+        ),
+        xaxis=dict(title="Action area"),
+        yaxis=dict(
+            title="Country",
+            range=[num_rows - 0.5, -1.8],
+            ticksuffix="  ",
+        ),
+        yaxis2=dict(
+            range=[num_rows - 0.5, -1.8],
+            overlaying="y",
+            visible=False,
+        ),
     )
 
-    add_separators_and_annotations(fig, df, ordered_cols, norm_matrix)
+    add_separators_and_annotations(fig, groups, num_rows)
 
-    fig.update_yaxes(ticksuffix="  ")
-    fig.update_traces(hoverinfo="text", hovertext=hovertext)
     fig.update_xaxes(showline=False, zeroline=False)
     fig.update_yaxes(showline=False, zeroline=False)
     fig.update_xaxes(showgrid=False)
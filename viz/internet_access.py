@@ -1,27 +1,34 @@
 import plotly.express as px
-import pandas as pd
 
+import datasets
 
-def graph(df, template):
-    title = "Digital Access Components vs. Internet Availability"
-    description = "This chart compares components of institutional data openness (normalized) against internet access rates. The stacked areas show each country's performance across different accessibility dimensions, while the line indicates their internet penetration rate."
+AREA_COLUMNS = [
+    "Accessibility",
+    "Language",
+    "Data Sharing",
+    "Political integrity interoperability",
+]
 
+
+def normalize(df):
     df = df.sort_values("internet_access", ascending=False)
-    area_columns = [
-        "Accessibility",
-        "Language",
-        "Data Sharing",
-        "Political integrity interoperability",
-    ]
-    df_normalized = df[area_columns].div(4)
+    df_normalized = df[AREA_COLUMNS].div(4)
     df_normalized["country"] = df["country"]
     df_normalized["internet_access"] = df["internet_access"]
+    return df_normalized
+
+
+def graph(df, template):
+    title = "Digital Access Components vs. Internet Availability"
+    description = "This chart compares components of institutional data openness (normalized) against internet access rates. The stacked areas show each country's performance across different accessibility dimensions, while the line indicates their internet penetration rate."
+
+    df_normalized = datasets.derived(df, "internet_access", normalize)
     line_color = "#5E35B1"
     axis_color = "#5E35B1"
     fig = px.area(
         df_normalized,
         x="country",
-        y=area_columns,
+        y=AREA_COLUMNS,
         template=template,
         labels={
             "value": "Normalized Institutional Components (%)",
@@ -0,0 +1,23 @@
+"""WSGI entry point for production (see gunicorn.conf.py).
+
+Importing it loads the datasets and viz modules and builds every slide payload
+up front. With gunicorn's preload_app this happens once in the master, and the
+forked workers share the result:
+
+- the datasets are memory-mapped .npy columns (GDB_DATA_CACHE_DIR), backed by
+  the page cache rather than by any process;
+- slides are kept as serialised payloads (immutable bytes), and the figure
+  objects they were built from are dropped once the payloads exist.
+"""
+
+import os
+
+import app
+import slides
+
+server = app.server
+
+slides.load()
+slides.warm_up(threads=int(os.environ.get("GDB_WARMUP_THREADS", "0")))
+# Workers only serve payloads; get_slide() rebuilds a figure if asked for one.
+slides.release_figures()